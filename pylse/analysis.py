@@ -20,8 +20,23 @@ def delay(wire) -> Union[float, Set[float]]:
         have a different firing delay. We return warning and set of delays
         in that case. Note that this doesn't take into account any variability
         that may exist when you run the simulation with variability turned on.
+
+        Results are memoized per circuit, and dropped when the circuit is reset.
     """
-    node = working_circuit()._src_map[wire]
+    circuit = working_circuit()
+    delays = circuit._delay_cache.get(wire)
+    if delays is None:
+        delays = frozenset(_delays(circuit, wire))
+        circuit._delay_cache[wire] = delays
+    if len(delays) == 1:
+        return next(iter(delays))
+    else:
+        warn("Returning multiple delays for wire {}".format(wire.name))
+        return set(delays)
+
+
+def _delays(circuit, wire) -> Set[float]:
+    node = circuit._src_map[wire]
     oname = output_name(wire)
     delays = set()
     assert isinstance(node.element, Transitional)
@@ -34,11 +49,7 @@ def delay(wire) -> Union[float, Set[float]]:
         raise PylseError(
             f"No delay found for wire {wire} named {wire.name} (is it connected to a node?)"
         )
-    if len(delays) == 1:
-        return delays.pop()
-    else:
-        warn("Returning multiple delays for wire {}".format(wire.name))
-        return delays
+    return delays
 
 
 def critical_path(clk_wire, circuit=None):
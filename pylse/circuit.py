@@ -1,5 +1,7 @@
-from typing import List, Dict, Set, Optional, Union
-from collections import defaultdict
+from typing import Callable, List, Dict, Set, FrozenSet, Optional, Union
+from collections import defaultdict, deque
+
+import numpy as np
 
 from .core import Node, Wire, Element
 from .transitional import Transitional
@@ -10,38 +12,47 @@ class Circuit:
     ''' Holds information about the circuit being constructed '''
 
     def __init__(self):
-        self._initialize()
+        self.nodes: Set[Node] = set()
+        self.wires: Set[Wire] = set()
+        self._source_wire = None
+        self._sink_node = None
+        # The following are for efficiency:
+        self._wire_by_name: Dict[str, Wire] = {}
+        self._src_map: Dict[Wire, Node] = {}
+        self._dst_map: Dict[Wire, List[Node]] = defaultdict(list)
+        # Memoized results of `analysis.delay`, keyed by wire
+        self._delay_cache: Dict[Wire, FrozenSet[float]] = {}
 
     def reset(self):
-        self._initialize()
+        # Clear the existing containers in place rather than allocating new ones
+        self.nodes.clear()
+        self.wires.clear()
+        self._source_wire = None
+        self._sink_node = None
+        self._wire_by_name.clear()
+        self._src_map.clear()
+        self._dst_map.clear()
+        self._delay_cache.clear()
         Wire._reset_wire_id()
         Node._reset_node_id()
 
     def __iter__(self):
-        src_nodes = [] if self._source_wire is None else [self.src_map[self._source_wire]]
+        src_nodes = deque()
+        if self._source_wire is not None:
+            src_nodes.append(self.src_map[self._source_wire])
         # src_nodes = self.dst_map[self._source_wire]  # Do this to hide the implicit _Source node
         seen = set()
 
         while src_nodes:
-            src_node, src_nodes = src_nodes[0], src_nodes[1:]
+            src_node = src_nodes.popleft()
             if src_node in seen:
                 continue
             seen.add(src_node)
             yield(src_node)
 
             for w in src_node.output_wires:
-                ns = self.dst_map[w]
-                src_nodes.extend(ns)
-
-    def _initialize(self):
-        self.nodes: Set[Node] = set()
-        self.wires: Set[Wire] = set()
-        self._source_wire = None
-        self._sink_node = None
-        # The following are for efficiency:
-        self._wire_by_name: Dict[str, Wire] = {}
-        self._src_map: Dict[Wire, Node] = {}
-        self._dst_map: Dict[Wire, List[Node]] = defaultdict(list)
+                # .get() so that iterating doesn't add empty entries to the defaultdict
+                src_nodes.extend(self.dst_map.get(w, ()))
 
     # Hide both of these since they should only be updated internally
     @property
@@ -128,10 +139,38 @@ class Circuit:
         # Wires were added to the environment separately
         n = Node(element, inputs, outputs)
         self.sanity_check_node(n)
+        self._register_node(n)
+
+    def add_chain(self, make_element: Callable[[], Element], n: int, inp: Wire,
+                  names: Optional[List[Optional[str]]] = None) -> List[Wire]:
+        """ Add n single-input, single-output elements in series, starting from inp.
+
+        :param make_element: function called to create each element of the chain
+        :param n: number of elements in the chain
+        :param inp: wire entering the first element
+        :param names: names for the output wire of each element (None for a temporary name)
+        :return: the output wires of the elements, in chain order
+        """
+        if names is None:
+            names = [None] * n
+        if len(names) != n:
+            raise PylseError(f"Expected {n} names for the chain's wires, got {len(names)}.")
+        outs = [Wire(name) for name in names]
+        ins = [inp] + outs[:-1]
+        for ix, (i, o) in enumerate(zip(ins, outs)):
+            node = Node(make_element(), [i], [o])
+            if ix == 0:
+                # The rest are connected only to wires created above, so this is the only
+                # node whose connections need checking (and all share the same element type).
+                self.sanity_check_node(node)
+            self._register_node(node)
+        return outs
+
+    def _register_node(self, n: Node):
         self.nodes.add(n)
-        for w in outputs:
+        for w in n.output_wires:
             self._src_map[w] = n
-        for w in inputs:
+        for w in n.input_wires:
             # Checking that w is not already connected to something is done in sanity_check_node()
             self._dst_map[w].append(n)
 
@@ -202,10 +241,17 @@ class InGen(Transitional):
     ]
     name = 'InGen'
 
-    def __init__(self, times: List[Union[int, float]]):
-        if any(type(t) not in (int, float) for t in times):
-            raise PylseError(f"InGen times must be ints or floats, given {times}.")
-        self.times = [float(t) for t in times]
+    def __init__(self, times: Union[np.ndarray, List[Union[int, float]]]):
+        if isinstance(times, np.ndarray):
+            if times.dtype.kind not in 'iuf':
+                raise PylseError(f"InGen times must be ints or floats, given {times}.")
+            # Convert the whole array at once, rather than checking each boxed element
+            self.times = times.astype(np.float64).ravel().tolist()
+        else:
+            if any(isinstance(t, bool) or not isinstance(t, (int, float, np.integer, np.floating))
+                   for t in times):
+                raise PylseError(f"InGen times must be ints or floats, given {times}.")
+            self.times = [float(t) for t in times]
         super().__init__()
 
     def handle_inputs(self, inputs, time) -> Dict[str, List[float]]:
@@ -239,10 +285,7 @@ def inp_at(*times, name=None):
     :param name: name to give the resulting input wire
     :return: wire where input pulses will come from
     '''
-    from .circuit import working_circuit
-    out = Wire(name)
-    working_circuit().add_node(InGen(list(times)), [working_circuit().source_wire()], [out])
-    return out
+    return _inp_gen(list(times), name)
 
 
 def inp(start=0.0, period=0.0, n=1, name=None):
@@ -262,8 +305,14 @@ def inp(start=0.0, period=0.0, n=1, name=None):
     if n > 1 and period == 0.0:
         raise PylseError("Period must be non-zero if niter > 1")
 
-    times = [start + period*n for n in range(n)]
-    return inp_at(*times, name=name)
+    times = np.arange(n, dtype=np.float64) * period + start
+    return _inp_gen(times, name)
+
+
+def _inp_gen(times: Union[np.ndarray, List[Union[int, float]]], name: Optional[str]) -> Wire:
+    out = Wire(name)
+    working_circuit().add_node(InGen(times), [working_circuit().source_wire()], [out])
+    return out
 
 
 def _connect(inwire, outwire):
@@ -1,3 +1,4 @@
+import sys
 from abc import ABC, abstractmethod
 from typing import Dict, List, ClassVar
 from dataclasses import dataclass, field
@@ -10,6 +11,8 @@ def is_temporary_wire_name(name):
 
 
 class Wire():
+    __slots__ = ('_name', 'observed_as')
+
     # Class attributes
     next_wire_id = 0
     prefix = "_"
@@ -27,6 +30,8 @@ class Wire():
     @name.setter
     def name(self, new_name):
         from .circuit import working_circuit
+        # Interned, since names are used as dictionary keys throughout (e.g. simulation events)
+        new_name = sys.intern(new_name)
         circuit = working_circuit()
         existing_wire = circuit.get_wire_by_name(new_name)
         if existing_wire:
@@ -120,20 +120,23 @@ def run_xsfq(input_times, wires_to_display=None, block=None):
 def export_to_blif(file, circuit: Circuit = None):
     circuit = working_circuit(circuit)
 
-    def _print(s):
-        print(s, file=file)
+    # Collect all lines first and write them out in one go at the end
+    lines: List[str] = []
+    _print = lines.append
 
-    connection_elements = circuit.node_subset(_Connection)
+    # Wires driven by a connection element are named after that element's input
+    connection_names: Dict[Wire, str] = {}
+    for ce in circuit.node_subset(_Connection):
+        for w in ce.output_wires:
+            connection_names.setdefault(w, ce.input_wires[0].name)
 
     def wire_name(wire):
-        for ce in connection_elements:
-            if wire in ce.output_wires:
-                return ce.input_wires[0].name
-        return wire.name
+        return connection_names.get(wire, wire.name)
 
     _to_blif_header(circuit, wire_name, _print)
     _to_blif_body(circuit, wire_name, _print)
     _to_blif_footer(circuit, wire_name, _print)
+    file.write('\n'.join(lines) + '\n')
 
 
 def _node_sort_key(node: Node):
@@ -1,6 +1,8 @@
 # pylint: disable=no-member
 from abc import abstractmethod
-from collections import namedtuple
+import functools
+import itertools
+from collections import namedtuple, OrderedDict
 from typing import Tuple
 
 from .pylse_exceptions import PylseError
@@ -723,7 +725,7 @@ def nand_s(in0: Wire, in1: Wire, clk: Wire, name=None, **overrides):
     return out
 
 
-def split(w, n=2, names=None, **overrides) -> Tuple[Wire, ...]:
+def split(w, n=2, names=None, flat=False, **overrides) -> Tuple[Wire, ...]:
     ''' Split a wire n ways, by creating n-1 splitter elements in a binary tree
 
     :param Wire w: wire to split
@@ -731,6 +733,8 @@ def split(w, n=2, names=None, **overrides) -> Tuple[Wire, ...]:
     :param Union[list[str], str] names: list of names to give each output wire; if given,
         must be equal in length to n. Can also be a string of whitespace-separated names.
         The order of the names is left-to-right order of the resulting splitter tree.
+    :param bool flat: if True, use a single n-way splitter element instead of a tree;
+        every output then fires after a single splitter delay.
     :param dict overrides: keyword arguments for overriding defaults of the element,
         such as: jjs, firing_delay, transition_time, error_transitions.
     :return: n new wires originating from w
@@ -744,6 +748,12 @@ def split(w, n=2, names=None, **overrides) -> Tuple[Wire, ...]:
     else:
         names = [None] * n
 
+    if flat and n > 1:
+        from .circuit import working_circuit
+        outs = [Wire(name) for name in names]
+        working_circuit().add_node(_split_n(n)(**overrides), [w], outs)
+        return tuple(outs)
+
     def f(w, n, names):
         if n == 1:
             return (w,)
@@ -759,7 +769,64 @@ def split(w, n=2, names=None, **overrides) -> Tuple[Wire, ...]:
     return f(w, n, names)
 
 
-def jtl_chain(w, n, names=[], **overrides) -> Wire:
+@functools.lru_cache(maxsize=None)
+def _split_n(n: int):
+    ''' Get the n-way splitter element class (created once per n). '''
+    output_names = [f'q{i}' for i in range(n)]
+
+    class SplitN(SFQ):
+        __doc__ = f''' {n}-way Splitter Element
+
+        A single node firing all outputs at once, with the timing of one splitter (S).
+        '''
+        name = f'S{n}'
+        inputs = ['a']
+        outputs = output_names
+        firing_delay = S.firing_delay
+        transitions = [
+            {'source': 'idle', 'trigger': 'a', 'dest': 'idle', 'firing': output_names,
+             'transition_time': firing_delay},
+        ]
+        jjs = S.jjs * (n - 1)  # same as the equivalent tree of splitters
+
+    SplitN.__name__ = SplitN.__qualname__ = f'S{n}'
+    return SplitN
+
+
+@functools.lru_cache(maxsize=None)
+def _fused_jtl_chain(n: int):
+    ''' Get the class of a fused chain of n JTLs (created once per n). '''
+    output_names = [f'q{i}' for i in range(n)]
+
+    class FusedJTLChain(Transitional):
+        __doc__ = f''' Chain of {n} JTLs fused into a single element
+
+        Output q<i> carries the pulse as it leaves the i-th JTL of the chain,
+        i.e. it fires i+1 JTL firing delays after the input arrives.
+        '''
+        name = f'JTL{n}'
+        inputs = ['a']
+        outputs = output_names
+        firing_delay = JTL.firing_delay
+        transitions = [
+            {'source': 'idle', 'trigger': 'a', 'dest': 'idle', 'firing': output_names},
+        ]
+        jjs = JTL.jjs * n
+
+        def _normalize_transitions(self):
+            # Every output was given the same (per-JTL) delay; accumulate them along the chain
+            return [
+                t._replace(firing=OrderedDict(
+                    zip(t.firing, itertools.accumulate(t.firing.values()))
+                ))
+                for t in super()._normalize_transitions()
+            ]
+
+    FusedJTLChain.__name__ = FusedJTLChain.__qualname__ = f'JTL{n}'
+    return FusedJTLChain
+
+
+def jtl_chain(w, n, names=[], fused=False, **overrides) -> Wire:
     ''' Create a chain of n JTL elements
 
     :param Wire w: wire to enter the first JTL in the chain
@@ -768,6 +835,12 @@ def jtl_chain(w, n, names=[], **overrides) -> Wire:
         the last len(names) JTLs in the chain. If names is a string, it's assumed that each
         individual name is separated by whitespace; thus, you can do names='foo' to give the
         last wire a name 'foo'.
+    :param bool fused: if True, create a single element with one output per JTL in the chain
+        (each still named as above), rather than n separate JTL elements. Pulse times are the
+        same up to floating point rounding, since the delays are summed before being added.
+        Two limits apply: with variability on, each output's accumulated delay is sampled once
+        rather than once per JTL, so the spread of the times differs from the unfused chain;
+        and the fused element can't be exported to UPPAAL (export_to_uppaal raises PylseError).
     :param dict overrides: keyword arguments for overriding defaults of the element,
         such as: jjs, firing_delay, transition_time, error_transitions.
     :return: wire coming out of the final JTL
@@ -778,7 +851,11 @@ def jtl_chain(w, n, names=[], **overrides) -> Wire:
         if len(names) > n:
             raise PylseError("Too many names given for jtl_chain wires.")
 
+    from .circuit import working_circuit
     names = [None] * (n - len(names)) + names
-    for ix in range(n):
-        w = jtl(w, names[ix], **overrides)
-    return w
+    if fused and n > 0:
+        outs = [Wire(name) for name in names]
+        working_circuit().add_node(_fused_jtl_chain(n)(**overrides), [w], outs)
+    else:
+        outs = working_circuit().add_chain(lambda: JTL(**overrides), n, w, names)
+    return outs[-1] if outs else w
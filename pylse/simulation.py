@@ -1,18 +1,24 @@
 import random
 import sys
 import itertools
-from typing import List, Dict
-from heapq import heappop, heappush
-from collections import defaultdict, namedtuple
+from typing import List, Dict, Deque, FrozenSet
+from heapq import heappop, heappush, heapreplace
+from collections import defaultdict, namedtuple, deque
 import json
+from array import array
+
+import numpy as np
 
 from .visual import plot, _graph_default_stylesheet, _graph_elements
 from .circuit import working_circuit, InGen, _Source
-from .core import Node
+from .core import Node, Wire
 from .transitional import Transitional
 from .pylse_exceptions import PylseError
 
-Pulse = namedtuple('Pulse', ['time', 'wire'])
+# `seq` is a monotonically increasing insertion counter; it breaks ties between
+# pulses scheduled for the same time so they pop in a deterministic (FIFO) order
+# without falling back to comparing wires.
+Pulse = namedtuple('Pulse', ['time', 'seq', 'wire'])
 
 
 class Simulation:
@@ -22,14 +28,70 @@ class Simulation:
 
     def _initialize(self):
         self.pulse_heap: List[Pulse] = []
+        self._pulse_seq = itertools.count()
+        # Remaining (sorted) pulse times of each input wire not yet on the heap
+        self._input_streams: Dict[Wire, Deque[float]] = {}
+        # Wires that feed some node, and how many pulses pending on the heap are on them;
+        # once none are left, no pulse on the heap can cause any further pulses.
+        self._feeds_nodes: FrozenSet[Wire] = frozenset()
+        self._continuing: int = 0
         self.now: float = 0.0
         self.events_to_plot: Dict[str, List[float]] = {}  # result from simulating
+        # Columnar record of the observed events, in the order they happened: the time
+        # of each event, and the index of the wire it was seen on into `observed_names`.
+        self.observed_names: List[str] = []
+        self._event_times = array('d')
+        self._event_wire_ixs = array('q')
         self.until: float = 0.0  # computed during simulation
         # self.states = {}  # Map from time to state of the system? For backwards stepping
 
+    def reset(self):
+        """ Clear the pending pulses and simulation time so this object can be reused.
+
+        The pulse heap is emptied in place; the events dictionary is replaced rather
+        than cleared, so results returned by a previous call to `simulate` stay intact.
+        """
+        self.pulse_heap.clear()
+        self._pulse_seq = itertools.count()
+        self._input_streams.clear()
+        self._continuing = 0
+        self.now = 0.0
+        self.events_to_plot = {}
+        self.observed_names = []
+        self._event_times = array('d')
+        self._event_wire_ixs = array('q')
+        self.until = 0.0
+
     def add_pulse(self, time, wire):
         assert time >= self.now
-        heappush(self.pulse_heap, Pulse(time, wire))
+        heappush(self.pulse_heap, Pulse(time, next(self._pulse_seq), wire))
+        if wire in self._feeds_nodes:
+            self._continuing += 1
+
+    def _add_input_stream(self, times: List[float], wire: Wire):
+        ''' Schedule a series of pulses on an input wire lazily.
+
+        Only the earliest pending pulse of each stream is kept on the heap; the next
+        one is pushed when it is popped, so the heap merges the already-sorted input
+        streams instead of holding (and re-sorting) every input pulse up front.
+        '''
+        stream = deque(sorted(times))
+        if stream:
+            self._input_streams[wire] = stream
+            self.add_pulse(stream.popleft(), wire)
+
+    def _pop_pulse(self) -> Pulse:
+        heap = self.pulse_heap
+        wire = heap[0].wire
+        stream = self._input_streams.get(wire)
+        if stream:
+            # Replace the popped pulse with its stream's next one in a single sift. It's
+            # on the same wire, so the count of pulses continuing to nodes is unchanged.
+            return heapreplace(heap, Pulse(stream.popleft(), next(self._pulse_seq), wire))
+        p = heappop(heap)
+        if wire in self._feeds_nodes:
+            self._continuing -= 1
+        return p
 
     def _add_initial_pulse(self):
         self.add_pulse(self.now, self.circuit.source_wire())
@@ -116,36 +178,66 @@ class Simulation:
             self.variability = None
 
     def _restart_simulation(self, variability):
-        self._initialize()
-        for node in self.circuit:
+        self.reset()
+        # Order doesn't matter here, so skip the traversal and just visit every node
+        for node in self.circuit.nodes:
             if isinstance(node.element, Transitional):
                 node.element.fsm.reset()
         self._set_variability(variability)
+        self._compile_routing()
         self._add_initial_pulse()
 
-    def _get_all_simultaneous_pulses(self) -> Dict[Node, List[Pulse]]:
-        """ Group by destination """
+    def _compile_routing(self):
+        """ Precompute how pulses are routed, since the topology is fixed while simulating.
 
-        def dst_nodes(p: Pulse):
+        Builds a map from each wire to the nodes it feeds, and for each node, a map
+        from each of its input wires to the name of the corresponding element input
+        and a map from each element output name to its output wire.
+        """
+        self._routes: Dict[Wire, List[Node]] = {
+            w: dsts for w, dsts in self.circuit._dst_map.items() if dsts
+        }
+        self._feeds_nodes = frozenset(self._routes)
+        self._input_names: Dict[Node, Dict[Wire, str]] = {
+            node: self._node_input_names(node) for node in self.circuit.nodes
+        }
+        self._output_wires: Dict[Node, Dict[str, Wire]] = {
+            node: self._node_output_wires(node) for node in self.circuit.nodes
+        }
+
+    @staticmethod
+    def _node_input_names(node: Node) -> Dict[Wire, str]:
+        input_names = {}
+        for w, name in zip(node.input_wires, node.element.inputs):
+            input_names.setdefault(w, name)
+        return input_names
+
+    @staticmethod
+    def _node_output_wires(node: Node) -> Dict[str, Wire]:
+        return dict(zip(node.element.outputs, node.output_wires))
+
+    def _dst_nodes(self, wire: Wire) -> List[Node]:
+        dsts = self._routes.get(wire)
+        if dsts is None:
             # If pulse's wire has no destination node, implicitly send their signal to
             # global sink. Why? Right now, only to make it simpler that the pulse is recorded.
-            dsts = self.circuit._dst_map[p.wire]
-            if not dsts:
-                dsts = [self.circuit.sink_node()]
-            return dsts
+            dsts = self._routes[wire] = [self.circuit.sink_node()]
+        return dsts
 
+    def _get_all_simultaneous_pulses(self) -> Dict[Node, List[Pulse]]:
+        """ Group by destination """
         pulses = defaultdict(list)
         if len(self.pulse_heap) == 0:
             return pulses
 
-        p = heappop(self.pulse_heap)
-        for dn in dst_nodes(p):
+        p = self._pop_pulse()
+        for dn in self._dst_nodes(p.wire):
             pulses[dn].append(p)
         assert p.time >= self.now
         self.now = p.time
         while self.pulse_heap and (self.pulse_heap[0].time == p.time):
-            p = heappop(self.pulse_heap)
-            for dn in dst_nodes(p):
+            p = self._pop_pulse()
+            for dn in self._dst_nodes(p.wire):
                 pulses[dn].append(p)
         return pulses
 
@@ -172,28 +264,75 @@ class Simulation:
         self._restart_simulation(variability)
 
         # Print all named wires, even those that don't receive a pulse during simulation.
+        observed_ixs: Dict[str, int] = {}
+        # Precompute, per observed wire, the column its events are recorded under
+        wire_ixs: Dict[Wire, int] = {}
         for w in self.circuit.wires:
             if w.observed_as is not None:
-                self.events_to_plot[w.observed_as] = []
+                wire_ixs[w] = observed_ixs.setdefault(w.observed_as, len(observed_ixs))
+        self.observed_names = list(observed_ixs)
+        record_time, record_ix = self._event_times.append, self._event_wire_ixs.append
+
+        def record(p: Pulse):
+            if (ix := wire_ixs.get(p.wire)) is not None:
+                record_time(self.now)
+                record_ix(ix)
 
         while until is None or self.now < until:
             print_to_log()
 
+            if not self._continuing and log is None:
+                # Only pulses headed to the sink are left, so there's nothing to dispatch
+                self._drain_sink_pulses(until, record)
+                break
+
             # Get the next pulses to process
             pulses = self._get_all_simultaneous_pulses()
             if not pulses:
                 break
 
-            # Add the selected output pulses to the dictionary
+            # Record the selected output pulses
             for dst, ps in pulses.items():
                 for p in ps:
-                    if p.wire.observed_as is not None:
-                        self.events_to_plot[p.wire.observed_as].append(self.now)
+                    record(p)
                 self.send_pulses(dst, ps)
 
         self.until = until if until else self.now
+        self.events_to_plot = self._events_by_name()
         return self.events_to_plot
 
+    def _drain_sink_pulses(self, until, record):
+        ''' Record the remaining pulses without sending them anywhere.
+
+        Only valid when none of the pending pulses feed a node; stops at the same
+        point the main simulation loop would, given `until`.
+        '''
+        while self.pulse_heap and (until is None or self.now < until):
+            p = self._pop_pulse()
+            assert p.wire not in self._feeds_nodes
+            self.now = p.time
+            record(p)
+            while self.pulse_heap and (self.pulse_heap[0].time == p.time):
+                record(self._pop_pulse())
+
+    def event_arrays(self):
+        """ Get the events recorded by the last simulation in columnar form.
+
+        :return: a pair of arrays `(times, wire_ixs)` of equal length, in the order the
+            events occurred, where `wire_ixs[i]` is the index into `self.observed_names`
+            of the wire on which the pulse at `times[i]` was seen.
+        """
+        return (np.array(self._event_times, dtype=np.float64),
+                np.array(self._event_wire_ixs, dtype=np.int64))
+
+    def _events_by_name(self) -> Dict[str, List[float]]:
+        times, ixs = self.event_arrays()
+        # Stable sort keeps each wire's events in time order
+        grouped = times[np.argsort(ixs, kind='stable')]
+        counts = np.bincount(ixs, minlength=len(self.observed_names))
+        per_wire = np.split(grouped, np.cumsum(counts)[:-1])
+        return {name: ts.tolist() for name, ts in zip(self.observed_names, per_wire)}
+
     def send_pulses(self, dst_node: Node, pulses: List[Pulse]):
         """ Alert node listening for these pulses.
 
@@ -203,33 +342,30 @@ class Simulation:
         """
 
         # At least one pulse, and they are all the same time
-        assert(len(set(p.time for p in pulses)) == 1)
-
-        def get_pulse(inp_wire):
-            for p in pulses:
-                if inp_wire is p.wire:
-                    return True
-            return False
-
-        def get_input_wire_name(inp_wire):
-            ix = dst_node.input_wires.index(inp_wire)
-            return dst_node.element.inputs[ix]
-
-        def get_output_wire(out_name):
-            ix = dst_node.element.outputs.index(out_name)
-            return dst_node.output_wires[ix]
-
-        inputs = {get_input_wire_name(i): get_pulse(i) for i in dst_node.input_wires}
+        time = pulses[0].time
+        assert all(p.time == time for p in pulses)
+
+        input_names = self._input_names.get(dst_node)
+        if input_names is None:
+            input_names = self._input_names[dst_node] = self._node_input_names(dst_node)
+        high_wires = {p.wire for p in pulses}
+        inputs = {name: w in high_wires for w, name in input_names.items()}
         try:
-            outputs = dst_node.element.handle_inputs(inputs, pulses[0].time)
+            outputs = dst_node.element.handle_inputs(inputs, time)
         except PylseError as err:
             high_inputs = [i for i in inputs if inputs[i]]
             raise PylseError(
                 "Error while sending input(s) '{0}' to the node with output wire '{1}':\n{2}".
                 format(', '.join(high_inputs), dst_node.output_wires[0].name, err)
             )
+        output_wires = self._output_wires.get(dst_node)
+        if output_wires is None:
+            output_wires = self._output_wires[dst_node] = self._node_output_wires(dst_node)
         for out_name, delays in outputs.items():
-            outw = get_output_wire(out_name)
+            outw = output_wires[out_name]
+            if not self.variability and isinstance(dst_node.element, InGen):
+                self._add_input_stream([self.now + delay for delay in delays], outw)
+                continue
             for delay in delays:
                 if self.variability:
                     delay = self.variability(delay, dst_node)
@@ -272,6 +408,8 @@ class Simulation:
         for pulse in self.pulse_heap:
             pulse = {'time': pulse.time, 'on_wire': pulse.wire.name}
             pulses.append(pulse)
+        for wire, stream in self._input_streams.items():
+            pulses.extend({'time': time, 'on_wire': wire.name} for time in stream)
         info['pending_pulses'] = pulses
 
         # json.dump(info, file)
@@ -0,0 +1,26 @@
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+def assert_events_equal(actual: Dict[str, Sequence[float]],
+                        expected: Dict[str, Sequence[float]], atol: float = 0.0):
+    """ Check that simulated events match the expected ones, wire by wire.
+
+    :param actual: map from wire name to event times, e.g. as returned by `simulate()`
+    :param expected: map from wire name to expected event times
+    :param atol: absolute tolerance when comparing times (default 0.0, i.e. exact)
+
+    Times may be given as lists or numpy arrays; either way they are compared as
+    float64 arrays. Raises AssertionError if the wire names or any times differ.
+    """
+    if set(actual) != set(expected):
+        raise AssertionError(
+            f"Events are on different wires: got {sorted(actual)}, expected {sorted(expected)}"
+        )
+    for name, times in expected.items():
+        np.testing.assert_allclose(
+            np.asarray(actual[name], dtype=np.float64),
+            np.asarray(times, dtype=np.float64),
+            rtol=0, atol=atol, err_msg=f"Events on wire '{name}' differ"
+        )
@@ -1,7 +1,9 @@
 from collections import namedtuple, defaultdict
-from typing import List, Dict, NamedTuple, Set, Union, OrderedDict
+from typing import List, Dict, NamedTuple, Set, Tuple, Union, OrderedDict
 from abc import abstractmethod
+from array import array
 import itertools
+import sys
 
 from .pylse_exceptions import PylseError
 from .core import Element
@@ -48,6 +50,47 @@ Transitioning = namedtuple(
 )
 
 
+class _FSMTables:
+    ''' Lookup tables for stepping an FSM.
+
+    These only depend on the inputs and (normalized) transitions, which don't change
+    after creation, so they are built once and shared by every FSM with the same ones.
+    '''
+    __slots__ = ('input_ixs', 'never_seen', 'transitions_by_source', 'input_ranks_by_source',
+                 'transition_table', 'past_constraints')
+
+    def __init__(self, inputs: List[str], transitions: List[NormalizedTransition]):
+        # Position of each input in `inputs`, and a last-seen time array for none seen yet
+        self.input_ixs: Dict[str, int] = {i: ix for ix, i in enumerate(inputs)}
+        self.never_seen = array('d', [float('-inf')]) * len(inputs)
+        # Group the transitions by source state (already in priority order)
+        # once rather than filtering/sorting on each step.
+        self.transitions_by_source: Dict[str, List[NormalizedTransition]] = {
+            source: get_transitions_from_source(source, transitions)
+            for source in {t.source for t in transitions}
+        }
+        # For each source state, map input name -> integer rank of its highest-priority
+        # transition, so that simultaneous inputs can be ordered without list searches.
+        self.input_ranks_by_source: Dict[str, Dict[str, int]] = {}
+        for source, ts in self.transitions_by_source.items():
+            ranks = self.input_ranks_by_source[source] = {}
+            for t in ts:
+                ranks.setdefault(t.trigger, len(ranks))
+        # (source state, input) -> highest-priority matching transition
+        self.transition_table: Dict[Tuple[str, str], NormalizedTransition] = {}
+        for source, ts in self.transitions_by_source.items():
+            for t in ts:
+                self.transition_table.setdefault((source, t.trigger), t)
+        # Transition id -> the (input index, input, min distance) triples of its past
+        # constraints that can actually be violated; normalization gives every input one,
+        # mostly of 0. One on a name that isn't an input could never be violated either.
+        self.past_constraints: Dict[str, Tuple[Tuple[int, str, float], ...]] = {
+            t.id: tuple((self.input_ixs[i], i, d) for i, d in t.past_constraints.items()
+                        if d > 0 and i in self.input_ixs)
+            for t in transitions
+        }
+
+
 class FSM:
     ''' A finite-state machine.
 
@@ -55,25 +98,46 @@ class FSM:
         the FSM class is used for tracking the current state, i.e. it's an
         instance of the transition system that has state/can be manipulated.
     '''
+    # There is one of these per element, so keep them small
+    __slots__ = ('curr_state', 'name', 'inputs', 'outputs', 'transitions', '_input_ixs',
+                 '_never_seen', '_transitions_by_source', '_input_ranks_by_source',
+                 '_transition_table', '_past_constraints', '_last_seen')
 
-    def __init__(self, name, inputs, outputs, transitions):
+    def __init__(self, name, inputs, outputs, transitions, tables: _FSMTables = None):
         ''' Create a finite state machine represented by a series of transitions.
 
         :param str: the name of the FSM (i.e. the name of the element given the class)
         :param list[str] inputs: list of inputs
         :param list[str] outputs: list of outputs
         :param list[NormalizedTransition] transitions: list of normalized transitions objects
+        :param _FSMTables tables: lookup tables already built for these inputs and
+            transitions, to share; if not given, they are built for this FSM
         '''
         self.curr_state: Union[str, Transitioning] = 'idle'
         self.name = name
         self.inputs = inputs
         self.outputs = outputs
         self.transitions = transitions
-        self._last_seen: Dict[str, Union[None, float]] = {i: None for i in inputs}
+        if tables is None:
+            tables = _FSMTables(inputs, transitions)
+        self._input_ixs = tables.input_ixs
+        self._never_seen = tables.never_seen
+        self._transitions_by_source = tables.transitions_by_source
+        self._input_ranks_by_source = tables.input_ranks_by_source
+        self._transition_table = tables.transition_table
+        self._past_constraints = tables.past_constraints
+        # Time each input was last seen, by position in `inputs` (-inf if not seen yet);
+        # along with the current state, the only thing that is per-FSM.
+        self._last_seen = array('d', self._never_seen)
+
+    def transitions_from(self, state: str) -> List[NormalizedTransition]:
+        ''' Return the transitions leaving the given state, in priority order. '''
+        return self._transitions_by_source.get(state, [])
 
     def reset(self):
         self.curr_state = 'idle'
-        self._last_seen = {i: None for i in self.inputs}
+        # In place, since this is done for every node before each simulation
+        self._last_seen[:] = self._never_seen
 
     def step(self, input: str, curr_time: float, strict=True) -> Dict[str, List[float]]:
         ''' Step the FSM by passing in the name of the input that is high, along
@@ -89,8 +153,9 @@ class FSM:
         index is mapped to a list of floats (i.e. delays).
         '''
         curr_state = self.curr_state
-        inp_last_seen = self._last_seen[input]
-        self._last_seen[input] = curr_time
+        input_ix = self._input_ixs[input]
+        inp_last_seen = self._last_seen[input_ix]
+        self._last_seen[input_ix] = curr_time
 
         if isinstance(curr_state, Transitioning):
             min_legal_time = curr_state.start_time + curr_state.transition.transition_time
@@ -106,7 +171,8 @@ class FSM:
                     f"to transition is at time {min_legal_time}."
                 )
 
-        transition = get_matching_transition(curr_state, input, self.transitions, strict=strict)
+        transition = get_matching_transition(curr_state, input, self.transitions,
+                                             strict=strict, table=self._transition_table)
 
         if transition is None:
             assert not strict
@@ -115,23 +181,23 @@ class FSM:
         elif transition.is_error:
             raise PylseError(f"Triggered erroneous transition id '{transition.id}'")
         else:
-            for inp, min_distance in transition.past_constraints.items():
-                if inp is input:
+            for ix, inp, min_distance in self._past_constraints[transition.id]:
+                if ix == input_ix:
                     # To avoid getting the current time for the input that triggered us
                     last_seen = inp_last_seen
                 else:
-                    last_seen = self._last_seen[inp]
+                    last_seen = self._last_seen[ix]
 
-                if last_seen is not None:  # None would be if it hasn't been seen yet
-                    if (actual_dist := (curr_time - last_seen)) < min_distance:
-                        raise PylseError(
-                            f"Prior input violation on FSM '{self.name}'. A constraint on "
-                            f"transition '{transition.id}', triggered at time {curr_time}, "
-                            f"given via the 'past_constraints' field says it is an error to "
-                            f"trigger this transition if input '{inp}' was seen as recently as "
-                            f"{min_distance} time units ago. It was last seen at {last_seen}, "
-                            f"which is {min_distance - actual_dist} time units to soon."
-                        )
+                # An input not seen yet is at -inf, so is infinitely far away
+                if (actual_dist := (curr_time - last_seen)) < min_distance:
+                    raise PylseError(
+                        f"Prior input violation on FSM '{self.name}'. A constraint on "
+                        f"transition '{transition.id}', triggered at time {curr_time}, "
+                        f"given via the 'past_constraints' field says it is an error to "
+                        f"trigger this transition if input '{inp}' was seen as recently as "
+                        f"{min_distance} time units ago. It was last seen at {last_seen}, "
+                        f"which is {min_distance - actual_dist} time units to soon."
+                    )
 
             if transition.transition_time > 0:
                 self.curr_state = Transitioning(curr_time, transition)
@@ -148,9 +214,12 @@ class FSM:
         '''
         s = self.curr_state.transition.destination if isinstance(self.curr_state, Transitioning)\
             else self.curr_state
-        ordered_inputs = [ts.trigger for ts in get_transitions_from_source(s, self.transitions)]
+        ranks = self._input_ranks_by_source.get(s, {})
         high_inputs = [i for i, high in inputs.items() if high]
-        return sorted(high_inputs, key=lambda i: ordered_inputs.index(i))
+        if len(high_inputs) < 2:
+            return high_inputs
+        # Inputs without a transition from this state go last (and are reported by `step`)
+        return sorted(high_inputs, key=lambda i: ranks.get(i, len(ranks)))
 
 
 class Transitional(Element):
@@ -183,13 +252,59 @@ class Transitional(Element):
     def __init__(self, **overrides):
         # An absent key, or a key with a None value means to use default
         self._overrides = {k: v for k, v in overrides.items() if v is not None}
-        self._set_transition_ids()
-        self._sanity_check()
+        self._check_overrides()
+        cls = type(self)
+        # The transitions are defined on the class, so they only need to be checked (and given
+        # ids) once per class. Look in the class's own __dict__ so subclasses are checked too.
+        # Reassigning transitions, firing_delay, transition_time or error_transitions on the
+        # class has them checked again, and drops the triggers and normalized transitions
+        # cached so far (changing the transitions list or its dicts in place does not).
+        definition = self._class_definition()
+        checked = cls.__dict__.get('_transitions_checked')
+        if checked is None or checked[0] is not definition[0] or checked[1:] != definition[1:]:
+            cls._class_raw_triggers = None
+            self._set_transition_ids()
+            self._sanity_check()
+            cls._transitions_checked = definition
+            cls._normalized_cache = {}
         self._store_fsm_overrides()
         # After this, self.transitions is of type List[NormalizedTransition]
         self._orig_transitions = self.transitions
-        self.transitions = self._normalize_transitions()
-        self._fsm = FSM(self.name, self.inputs, self.outputs, self.transitions)
+        self.transitions, fsm_tables = self._shared_normalized_transitions()
+        # Id -> transition map, built on first use from the list it is stored with
+        self._transitions_by_id = (None, {})
+        self._fsm = FSM(self.name, self.inputs, self.outputs, self.transitions, fsm_tables)
+
+    def _class_definition(self):
+        ''' The class attributes that checking and normalizing the transitions depend on.
+
+        The transitions list is compared by identity, since giving it ids modifies it.
+        '''
+        cls = type(self)
+        return (cls.transitions, _freeze(cls.firing_delay), _freeze(cls.transition_time),
+                _freeze(cls.error_transitions))
+
+    def _shared_normalized_transitions(self) -> Tuple[List[NormalizedTransition], _FSMTables]:
+        ''' Normalize the transitions, reusing the result across instances when possible.
+
+        Normalization only depends on the class definition and the overrides, so all
+        instances of a class created with equal overrides share one (read-only) list,
+        along with the lookup tables their FSMs are stepped with.
+        '''
+        cls = type(self)
+        # Look in this class's own __dict__ so subclasses don't inherit a parent's cache
+        cache = cls.__dict__.get('_normalized_cache')
+        if cache is None:
+            cache = cls._normalized_cache = {}
+        key = _freeze(self._overrides)
+        shared = cache.get(key)
+        if shared is None:
+            # Equal overrides were already checked when they were first cached
+            if 'error_transitions' in self._overrides:
+                self._check_error_transition_ids(self._overrides['error_transitions'])
+            normalized = self._normalize_transitions()
+            shared = cache[key] = (normalized, _FSMTables(self.inputs, normalized))
+        return shared
 
     @transitions.setter
     def transitions(self, ts):
@@ -212,6 +327,17 @@ class Transitional(Element):
         for prop in ['jjs', 'error_transitions']:
             if prop in self._overrides:
                 setattr(self, prop, self._overrides[prop])
+        # A frozen copy, since it's checked against every transition when normalizing;
+        # error_transitions itself keeps the type it was given
+        self._error_tids = frozenset(self.error_transitions)
+
+    def _check_error_transition_ids(self, error_transitions):
+        ''' Check that the given error transition ids are those of transitions of the class. '''
+        all_tids = set(t['id'] for t in self.transitions)
+        unrecognized = set(error_transitions).difference(all_tids)
+        if unrecognized:
+            raise PylseError(f"Error transition id(s) {unrecognized} do(es) not "
+                             "match any given transition.")
 
     def handle_inputs(self, inputs: Dict[str, bool], time: float) -> Dict[str, List[float]]:
         ''' Handle incoming input pulses.
@@ -223,28 +349,34 @@ class Transitional(Element):
         :param float time: current time
         :return: a map from output name to list of pulses to be produced on that output wire
         '''
+        high_inputs = self.fsm.sorted_high_inputs(inputs)
+        if len(high_inputs) == 1:
+            # The usual case: a single step's outputs need no merging
+            return self.fsm.step(high_inputs[0], time, self.strict)
         outputs = defaultdict(list)
-        for input in self.fsm.sorted_high_inputs(inputs):
+        for input in high_inputs:
             output_dict = self.fsm.step(input, time, self.strict)
             for o, vs in output_dict.items():
                 outputs[o].extend(vs)
         return outputs
 
     def get_transition_by_id(self, tid):
+        indexed, by_id = self._transitions_by_id
+        if indexed is not self.transitions:
+            by_id = {}
+            for t in self.transitions:
+                # Several are created per id when a transition has multiple triggers
+                by_id.setdefault(t.id, t)
+            self._transitions_by_id = (self.transitions, by_id)
         try:
-            return next(trans for trans in self.transitions if trans.id == str(tid))
-        except StopIteration:
+            return by_id[str(tid)]
+        except KeyError:
             raise PylseError(
                 f"Cannot find transition by {tid}; "
                 f"available tids are {[t.id for t in self.transitions]}."
             )
 
-    def _sanity_check(self):
-        # _These two are special
-        from .circuit import _Source, _Sink
-        if isinstance(self, (_Source, _Sink)):
-            return
-
+    def _check_overrides(self):
         valid_types = {
             'jjs': (int,),
             'firing_delay': (float, int, dict),
@@ -267,198 +399,235 @@ class Transitional(Element):
                     f"{','.join([t.__name__ for t in valid_types[override_name]])}."
                 )
 
-        idle_found = False
-        ids = defaultdict(list)
-        for t in self.transitions:
-            if all(k not in t for k in ['source', 'src']):
+    def _sanity_check(self):
+        ''' Check that the transitions defined on the class describe a valid FSM.
+
+        Each concern is checked by its own method, in the order below, so that the
+        first problem found (in transition order) is the one reported.
+        '''
+        # _These two are special
+        from .circuit import _Source, _Sink
+        if isinstance(self, (_Source, _Sink)):
+            return
+
+        raw_triggers = self._raw_triggers()
+        for t, triggers in zip(self.transitions, raw_triggers):
+            self._check_transition_keys(t)
+            self._check_transition_triggers(t, triggers)
+            self._check_transition_outputs(t)
+            self._check_transition_times(t)
+
+        grouped_by_source = defaultdict(list)
+        for ix, t in enumerate(self.transitions):
+            grouped_by_source[t['source']].append((ix, t))
+        for source, group in grouped_by_source.items():
+            self._check_source_group(source, group, raw_triggers)
+
+        if 'idle' not in grouped_by_source:
+            raise PylseError("The given FSM does not have an 'idle' source state.")
+
+        self._check_unique_ids()
+        self._check_outputs_fired()
+
+        # Error transition ids given are valid
+        self._check_error_transition_ids(self.error_transitions)
+
+    @staticmethod
+    def _firing_outputs(t) -> List[str]:
+        flist = t.get('firing', [])
+        if isinstance(flist, str):
+            flist = [flist]
+        if isinstance(flist, dict):
+            flist = list(flist.keys())
+        return flist
+
+    def _check_transition_keys(self, t):
+        if all(k not in t for k in ['source', 'src']):
+            raise PylseError(
+                "The given FSM is missing a 'source' (or 'src') key in a transition."
+            )
+        if all(k in t for k in ['source', 'src']):
+            raise PylseError(
+                "Must supply either the 'source' or 'src' key, "
+                "but not both (they are equivalent)."
+            )
+
+        if 'trigger' not in t:
+            raise PylseError(
+                "The given FSM is missing a 'trigger' key in a transition."
+            )
+
+        if all(k not in t for k in ['destination', 'dest']):
+            raise PylseError(
+                "The given FSM is missing a 'destination' (or 'dest') key in a transition."
+            )
+
+        if all(k in t for k in ['destination', 'dest']):
+            raise PylseError(
+                "Must supply either the 'destination' or 'dest' key, "
+                "but not both (they are equivalent)."
+            )
+
+    def _check_transition_triggers(self, t, triggers: Tuple[str, ...]):
+        # Valid input/trigger name
+        tlist = list(triggers)
+        for tr in tlist:
+            if tr not in self.inputs:
                 raise PylseError(
-                    "The given FSM is missing a 'source' (or 'src') key in a transition."
+                    f"Input trigger '{t['trigger']}' from transitions was not "
+                    "found in list of inputs."
                 )
-            if all(k in t for k in ['source', 'src']):
+            if tlist.count(tr) > 1:
                 raise PylseError(
-                    "Must supply either the 'source' or 'src' key, "
-                    "but not both (they are equivalent)."
+                    f"Input trigger '{tr}' is found multiple times in trigger field '{tlist}'."
                 )
 
-            if 'trigger' not in t:
+    def _check_transition_outputs(self, t):
+        # Valid output name
+        flist = self._firing_outputs(t)
+        for f in flist:
+            if f not in self.outputs:
                 raise PylseError(
-                    "The given FSM is missing a 'trigger' key in a transition."
+                    f"Output '{f}' from transition was not "
+                    "found in list of outputs."
                 )
-
-            if all(k not in t for k in ['destination', 'dest']):
+            if flist.count(f) > 1:
                 raise PylseError(
-                    "The given FSM is missing a 'destination' (or 'dest') key in a transition."
+                    f"Output '{f}' is found multiple times in firing field '{flist}'."
                 )
 
-            if all(k in t for k in ['destination', 'dest']):
+    def _check_transition_times(self, t):
+        # Valid transition time
+        ttime = t.get('transition_time', 0)
+        if ttime != 'default' and type(ttime) not in (int, float):
+            raise PylseError(
+                "Transition time must be a number, "
+                f"got type {type(t['transition_time']).__name__}."
+            )
+        if isinstance(ttime, (int, float)) and ttime < 0:
+            raise PylseError(
+                f"Transition time must be a non-negative number, got {ttime}."
+            )
+
+        # Firing delay
+        fd = t.get('firing_delay', 0)
+        if type(fd) not in (int, float):  # don't want bools
+            if not isinstance(fd, dict):
                 raise PylseError(
-                    "Must supply either the 'destination' or 'dest' key, "
-                    "but not both (they are equivalent)."
+                    "Firing delay must be a number, or a dictionary "
+                    f"from output name to a number; got {type(fd).__name__}."
                 )
-
-            if t['source'] == 'idle':
-                idle_found = True
-
-            if 'id' in t:
-                ids[t['id']].append(t)
-
-            # Valid input/trigger name
-            tlist = key_to_list(t, 'trigger')
-            for tr in tlist:
-                if tr not in self.inputs:
-                    raise PylseError(
-                        f"Input trigger '{t['trigger']}' from transitions was not "
-                        "found in list of inputs."
-                    )
-                if tlist.count(tr) > 1:
-                    raise PylseError(
-                        f"Input trigger '{tr}' is found multiple times in trigger field '{tlist}'."
-                    )
-
-            # Valid output name
-            flist = t.get('firing', [])
-            if isinstance(flist, str):
-                flist = [flist]
-            if isinstance(flist, dict):
-                flist = list(flist.keys())
-            for f in flist:
-                if f not in self.outputs:
+            for d in fd.values():
+                if type(d) not in (int, float):
                     raise PylseError(
-                        f"Output '{f}' from transition was not "
-                        "found in list of outputs."
+                        "Firing delay dictionary values must be numbers; "
+                        f"got {type(d).__name__}."
                     )
-                if flist.count(f) > 1:
+                elif d < 0:
                     raise PylseError(
-                        f"Output '{f}' is found multiple times in firing field '{tlist}'."
+                        f"Firing delay must be a non-negative number, got {d}."
                     )
 
-            # Valid transition time
-            ttime = t.get('transition_time', 0)
-            if ttime != 'default' and type(ttime) not in (int, float):
+            invalid_keys = set(fd.keys()).difference(set(self._firing_outputs(t)))
+            if invalid_keys:
                 raise PylseError(
-                    "Transition time must be a number, "
-                    f"got type {type(t['transition_time']).__name__}."
-                )
-            if isinstance(ttime, (int, float)) and ttime < 0:
-                raise PylseError(
-                    f"Transition time must be a non-negative number, got {ttime}."
+                    "The following keys of a firing delay dictionary are not firing "
+                    f"outputs for this transition: {','.join(invalid_keys)}."
                 )
+        elif fd < 0:
+            raise PylseError(
+                f"Firing delay must be a non-negative number, got {fd}."
+            )
 
-            # Firing delay
-            fd = t.get('firing_delay', 0)
-            if type(fd) not in (int, float):  # don't want bools
-                if not isinstance(fd, dict):
-                    raise PylseError(
-                        "Firing delay must be a number, or a dictionary "
-                        f"from output name to a number; got {type(fd).__name__}."
-                    )
-                for d in fd.values():
-                    if type(d) not in (int, float):
-                        raise PylseError(
-                            "Firing delay dictionary values must be numbers; "
-                            f"got {type(d).__name__}."
-                        )
-                    elif d < 0:
-                        raise PylseError(
-                            f"Firing delay must be a non-negative number, got {d}."
-                        )
+        if 'setup_time' in t or 'reset_time' in t:
+            raise PylseError(
+                "When giving times for specific transitions, use the key 'transition_time'. "
+            )
 
-                invalid_keys = set(fd.keys()).difference(set(flist))
-                if invalid_keys:
-                    raise PylseError(
-                        "The following keys of a firing delay dictionary are not firing "
-                        f"outputs for this transition: {','.join(invalid_keys)}."
-                    )
-            elif fd < 0:
+        illegal_priors = t.get('illegal_priors', dict())
+        for k, v in illegal_priors.items():
+            if k != '*' and k not in self.inputs:
                 raise PylseError(
-                    f"Firing delay must be a non-negative number, got {fd}."
+                    f"Unrecognized key for 'illegal_priors' dictionary: {k}. "
+                    "Must use valid inputs to this machine."
                 )
-
-            if 'setup_time' in t or 'reset_time' in t:
+            if type(v) not in (int, float) or v < 0:
                 raise PylseError(
-                    "When giving times for specific transitions, use the key 'transition_time'. "
+                    f"Value for an illegal_prior mapping must be non-negative number, got {v} "
+                    f"in transition {t['id']}."
                 )
 
-            illegal_priors = t.get('illegal_priors', dict())
-            for k, v in illegal_priors.items():
-                if k != '*' and k not in self.inputs:
-                    raise PylseError(
-                        f"Unrecognized key for 'illegal_priors' dictionary: {k}. "
-                        "Must use valid inputs to this machine."
-                    )
-                if type(v) not in (int, float) or v < 0:
-                    raise PylseError(
-                        f"Value for an illegal_prior mapping must be non-negative number, got {v} "
-                        f"in transition {t['id']}."
-                    )
+    def _check_source_group(self, source: str, group: List[Tuple[int, dict]],
+                            raw_triggers: List[Tuple[str, ...]]):
+        ''' Check the (index, transition) pairs of the transitions leaving `source`. '''
+        assert len(group) >= 1
+        # All transitions with same source are defined next to each other
+        indices = [g[0] for g in group]
+        lower = indices[0]
+        upper = indices[-1]
+        if tuple(range(lower, upper+1)) != tuple(indices):
+            raise PylseError(
+                "All transitions from the same source must be defined consecutively, "
+                "which isn't the case for transitions from %s." % source
+            )
 
-        grouped_by_source = defaultdict(list)
-        for ix, t in enumerate(self.transitions):
-            grouped_by_source[t['source']].append((ix, t))
+        # No two transitions in the same group with the same trigger. Index the group's
+        # transitions by trigger in one pass, rather than comparing every pair.
+        group_triggers = [set(raw_triggers[ix]) for ix, _ in group]
+        occurrences = defaultdict(list)
+        for gix, triggers in enumerate(group_triggers):
+            for trigger in triggers:
+                occurrences[trigger].append(gix)
+        repeated = [gixs for gixs in occurrences.values() if len(gixs) > 1]
+        if repeated:
+            # Report the earliest transition with an ambiguous trigger,
+            # along with the first later one sharing a trigger with it.
+            first = min(gixs[0] for gixs in repeated)
+            second = min(gixs[1] for gixs in repeated if gixs[0] == first)
+            ambiguous = group_triggers[first].intersection(group_triggers[second])
+            raise PylseError(
+                f"Ambiguous triggers '{','.join(ambiguous)}' found on transitions:\n"
+                f"1) {group[first][1]}\n"
+                f"2) {group[second][1]}."
+            )
 
-        inputs = set(self.inputs)
-        for source, group in grouped_by_source.items():
-            assert len(group) >= 1
-            # All transitions with same source are defined next to each other
-            indices = [g[0] for g in group]
-            lower = indices[0]
-            upper = indices[-1]
-            if tuple(range(lower, upper+1)) != tuple(indices):
+        # A transition for every input trigger going out of this state
+        if self.strict:
+            inputs = set(self.inputs)
+            for ix, _ in group:
+                inputs.difference_update(raw_triggers[ix])
+            if inputs:
                 raise PylseError(
-                    "All transitions from the same source must be defined consecutively, "
-                    "which isn't the case for transitions from %s." % source
+                    "No transitions specified for inputs '%s' from state '%s'." %
+                    (str(','.join(inputs)), source)
                 )
 
-            # No two transitions in the same group with the same trigger
-            working_group = group
-            while working_group:
-                top, working_group = working_group[0], working_group[1:]
-                _top_ix, top_transition = top
-                tt_trigger = set(key_to_list(top_transition, 'trigger'))
-                for transition in working_group:
-                    _ix, t = transition
-                    ambiguous = tt_trigger.intersection(set(key_to_list(t, 'trigger')))
-                    if ambiguous:
-                        raise PylseError(
-                            f"Ambiguous triggers '{','.join(ambiguous)}' found on transitions:\n"
-                            f"1) {top_transition}\n"
-                            f"2) {t}."
-                        )
-
-            # A transition for every input trigger going out of this state
-            if self.strict:
-                inputs = set(self.inputs)
-                for _, t in group:
-                    inputs.difference_update(set(key_to_list(t, 'trigger')))
-                if inputs:
-                    raise PylseError(
-                        "No transitions specified for inputs '%s' from state '%s'." %
-                        (str(','.join(inputs)), source)
-                    )
+        # Either all of the transitions in this group have a priority, or none of them do
+        priorities = [t.get('priority') for _, t in group if t.get('priority') is not None]
+        if len(priorities) > 0 and len(priorities) < len(group):
+            raise PylseError(
+                f"Given a set of transitions originating from the same source ('{source}'), "
+                "either all of them must have a priority field, or none of them "
+                "must (in which case the priority is determined by the order in "
+                "which they were given in the transition list)."
+            )
 
-            # Either all of the transitions in this group have a priority, or none of them do
-            priorities = [t.get('priority') for _, t in group if t.get('priority') is not None]
-            if len(priorities) > 0 and len(priorities) < len(group):
+        next_legal_priority = 0
+        for priority in sorted(priorities):
+            if priority > next_legal_priority + 1:
                 raise PylseError(
-                    f"Given a set of transitions originating from the same source ('{source}'), "
-                    "either all of them must have a priority field, or none of them "
-                    "must (in which case the priority is determined by the order in "
-                    "which they were given in the transition list)."
+                    "Given a set of transitions originating from the same source ('idle'), "
+                    "set of priorites for that group must be consecutive (i.e. if transitions "
+                    "A and C have priority 0, transition B can have priority 0 or 1, but not "
+                    "2, since priority 1 hasn't been used yet)."
                 )
+            next_legal_priority = priority
 
-            next_legal_priority = 0
-            for priority in sorted(priorities):
-                if priority > next_legal_priority + 1:
-                    raise PylseError(
-                        "Given a set of transitions originating from the same source ('idle'), "
-                        "set of priorites for that group must be consecutive (i.e. if transitions "
-                        "A and C have priority 0, transition B can have priority 0 or 1, but not "
-                        "2, since priority 1 hasn't been used yet)."
-                    )
-                next_legal_priority = priority
-
-        if not idle_found:
-            raise PylseError("The given FSM does not have an 'idle' source state.")
+    def _check_unique_ids(self):
+        ids = defaultdict(list)
+        for t in self.transitions:
+            if 'id' in t:
+                ids[t['id']].append(t)
 
         for tid, transitions in ids.items():
             if len(transitions) > 1:
@@ -467,17 +636,13 @@ class Transitional(Element):
                                     for ix, transition in enumerate(transitions))
                 raise PylseError(output)
 
+    def _check_outputs_fired(self):
         if not len(self.outputs):
             raise PylseError("There must be at least one output; found none.")
 
         all_fired_outputs = set()
         for t in self.transitions:
-            firing = t.get('firing', set())
-            if isinstance(firing, str):
-                firing = [firing]
-            if isinstance(firing, dict):
-                firing = set(firing.keys())
-            all_fired_outputs.update(set(firing))
+            all_fired_outputs.update(self._firing_outputs(t))
 
         # For every output, there exists at least one transition that fires it
         for o in self.outputs:
@@ -486,12 +651,19 @@ class Transitional(Element):
                     f"There must be at least one transition that fires output '{str(o)}'."
                 )
 
-        # Error transition ids given are valid
-        all_tids = set(t['id'] for t in self.transitions)
-        unrecognized = self.error_transitions.difference(all_tids)
-        if unrecognized:
-            raise PylseError(f"Error transition id(s) {unrecognized} do(es) not "
-                             "match any given transition.")
+    def _raw_triggers(self) -> List[Tuple[str, ...]]:
+        ''' Get the expanded trigger names of each of the class's transitions, in order.
+
+        These are computed once per class, since they're needed by several of the checks
+        as well as for every normalization of the transitions.
+        '''
+        cls = type(self)
+        triggers = cls.__dict__.get('_class_raw_triggers')
+        if triggers is None:
+            triggers = cls._class_raw_triggers = [
+                tuple(key_to_list(t, 'trigger')) for t in self.transitions
+            ]
+        return triggers
 
     def _set_transition_ids(self):
         """ Assigns every transition an ID (if it doesn't have one already) """
@@ -529,7 +701,7 @@ class Transitional(Element):
         pix = 0
         prev_source = None
 
-        for transition in self.transitions:
+        for transition, triggers in zip(self.transitions, self._raw_triggers()):
 
             transition_time = self._overrides.get('transition_time')
             if isinstance(transition_time, (int, float)) and 'transition_time' not in transition:
@@ -594,11 +766,12 @@ class Transitional(Element):
                 firing = dict()
 
             is_error = transition['error'] if 'error' in transition else \
-                (transition['id'] in self.error_transitions)
-            triggers = key_to_list(transition, 'trigger')
+                (transition['id'] in self._error_tids)
+            # Interned, since these are used as keys of the FSM's lookup tables
+            triggers = [sys.intern(t) for t in triggers]
 
-            source = transition.get('source', transition.get('src'))
-            destination = transition.get('destination', transition.get('dest'))
+            source = sys.intern(transition.get('source', transition.get('src')))
+            destination = sys.intern(transition.get('destination', transition.get('dest')))
 
             # Lowest number is highest priority (so first defined if no 'priority' field)
             # These transitions are already grouped by source, so this is fine
@@ -672,8 +845,20 @@ def get_transitions_from_source(source_state: str,
     return s
 
 
+def _freeze(value):
+    ''' Convert a (possibly nested) override value into a hashable equivalent. '''
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
 def get_matching_transition(source_state: str, input: str,
-                            transitions: List[NormalizedTransition], strict=True):
+                            transitions: List[NormalizedTransition], strict=True,
+                            table: Dict[Tuple[str, str], NormalizedTransition] = None):
     ''' Find the transition that matches the current state and inputs.
 
     :param str source_state: state we're starting from
@@ -681,13 +866,16 @@ def get_matching_transition(source_state: str, input: str,
     :param List[NormalizedTransition] transitions: list of transitions to search
     :param bool strict: if True, raise an error if no matching transition is found;
         if False, just print a warning in such cases
+    :param table: optional map from (source state, input) to the highest-priority
+        matching transition; if given, it is used instead of searching `transitions`
     :return: the matching Normalized transition, or None if strict is False and none was found
     '''
-    ts = get_transitions_from_source(source_state, transitions)
-    try:
-        return next(t for t in ts if input == t.trigger)
-    except StopIteration:
-        if strict:
-            raise PylseError("No matching transition found from state "
-                             f"'{source_state}' on input '{input}'.")
-        return None
+    if table is not None:
+        transition = table.get((source_state, input))
+    else:
+        ts = get_transitions_from_source(source_state, transitions)
+        transition = next((t for t in ts if input == t.trigger), None)
+    if transition is None and strict:
+        raise PylseError("No matching transition found from state "
+                         f"'{source_state}' on input '{input}'.")
+    return transition
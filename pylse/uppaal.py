@@ -8,7 +8,7 @@ from collections import defaultdict, namedtuple
 import pyuppaal.pyuppaal as pyuppaal
 
 from .circuit import working_circuit, InGen
-from .sfq_cells import SFQ
+from .sfq_cells import SFQ, _fused_jtl_chain
 from .transitional import NormalizedTransition
 from .pylse_exceptions import PylseError
 
@@ -333,8 +333,14 @@ class PyLSENTA():
                 for f in range(soak):
                     for (shared, real) in zip(shared_outputs, real_outputs):
                         self._add_instance('FiringAuto', [shared, real], [firing_delay])
+            elif type(i.element) is _fused_jtl_chain(len(i.element.outputs)):
+                # Each output has its own firing delay, which the firing automata can't express
+                raise PylseError(
+                    f"Cannot convert {i.element.name} to UPPAAL: fused JTL chains are not "
+                    "supported; create the chain with jtl_chain(..., fused=False) instead."
+                )
             else:
-                raise Exception(f"Cannot convert {i.element.name} to PyLSE")
+                raise PylseError(f"Cannot convert {i.element.name} to UPPAAL")
 
         return self
 
@@ -1,9 +1,12 @@
 from pylse.simulation import Simulation
 import unittest
 
-from pylse import working_circuit, PylseError, Wire
+import numpy as np
+
+from pylse import working_circuit, PylseError, Wire, delay
 from pylse import jtl, m, inp, inp_at
 from pylse.circuit import _Source, InGen
+from pylse.sfq_cells import JTL
 
 
 class TestCircuit(unittest.TestCase):
@@ -28,6 +31,38 @@ class TestCircuit(unittest.TestCase):
             f"Did you want to use a splitter to split 'j1'?"
         )
 
+    def test_delay_is_cached_until_reset(self):
+        i1 = inp(name='i1')
+        j1 = jtl(i1, name='j1', firing_delay=3.5)
+        self.assertEqual(delay(j1), 3.5)
+        self.assertEqual(working_circuit()._delay_cache, {j1: frozenset({3.5})})
+        working_circuit().reset()
+        self.assertEqual(working_circuit()._delay_cache, {})
+
+    def test_reset_clears_in_place(self):
+        circuit = working_circuit()
+        nodes, src_map = circuit.nodes, circuit._src_map
+        jtl(inp(name='i1'), name='j1')
+        circuit.reset()
+        self.assertIs(circuit.nodes, nodes)
+        self.assertIs(circuit._src_map, src_map)
+        self.assertEqual(len(circuit.nodes), 0)
+        self.assertEqual(len(circuit.wires), 0)
+        self.assertIsNone(circuit.get_wire_by_name('j1'))
+
+    def test_add_chain(self):
+        i1 = inp(name='i1')
+        outs = working_circuit().add_chain(JTL, 3, i1, [None, 'j1', 'j2'])
+        self.assertEqual([w.name for w in outs], ['_0', 'j1', 'j2'])
+        nodes = [working_circuit()._src_map[w] for w in outs]
+        self.assertEqual([n.input_wires for n in nodes], [[i1], [outs[0]], [outs[1]]])
+        self.assertEqual([working_circuit()._dst_map[w] for w in outs[:-1]],
+                         [nodes[1:2], nodes[2:]])
+        with self.assertRaises(PylseError):
+            working_circuit().add_chain(JTL, 2, i1)
+        with self.assertRaises(PylseError):
+            working_circuit().add_chain(JTL, 2, i1, ['j3'])
+
     def test_backward_references(self):
         i1 = inp(name='i1')
         j1 = jtl(i1, name='j1')
@@ -98,6 +133,16 @@ class TestSpecial(unittest.TestCase):
             "InGen times must be ints or floats, given [1.0, 3, 'a']."
         )
 
+    def test_ingen_numpy_times(self):
+        self.assertEqual(InGen(np.array([1, 3])).times, [1.0, 3.0])
+        times = InGen([np.float32(0.5), np.int64(2), 4]).times
+        self.assertEqual(times, [0.5, 2.0, 4.0])
+        self.assertTrue(all(type(t) is float for t in times))
+        with self.assertRaises(PylseError):
+            InGen(np.array(['a']))
+        with self.assertRaises(PylseError):
+            InGen([True])
+
     def test_inp(self):
         period = 5
         n = 3
@@ -108,6 +153,12 @@ class TestSpecial(unittest.TestCase):
             'in0': [i * period for i in range(n)],
         })
 
+    def test_inp_with_start(self):
+        in0 = inp(start=5.0, period=1.3, n=3, name='in0')
+        times = working_circuit()._src_map[in0].element.times
+        self.assertEqual(times, [5.0 + 1.3 * i for i in range(3)])
+        self.assertTrue(all(type(t) is float for t in times))
+
     def test_inputs_at(self):
         _ins = inp_at(0.0, 1.0, 4.0, 13.0, name='ins')
         sim = Simulation()
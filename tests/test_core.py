@@ -1,3 +1,4 @@
+import sys
 import unittest
 
 import pylse
@@ -13,6 +14,17 @@ class TestWire(unittest.TestCase):
         self.assertEqual(w2.name, pylse.Wire.prefix + '1')
         self.assertEqual(w3.name, pylse.Wire.prefix + '2')
 
+    def test_wire_name_interned(self):
+        name = ''.join(['w', '1'])
+        w1 = pylse.Wire(name)
+        self.assertIs(w1.name, sys.intern('w1'))
+
+    def test_wire_has_no_dict(self):
+        w = pylse.Wire('w')
+        self.assertFalse(hasattr(w, '__dict__'))
+        with self.assertRaises(AttributeError):
+            w.foo = 3
+
     def test_wire_accessible_given_name(self):
         w1, w2 = pylse.Wire(name='w1'), pylse.Wire(name='w2')
         self.assertIs(pylse.working_circuit().get_wire_by_name('w1'), w1)
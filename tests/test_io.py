@@ -41,10 +41,11 @@ class TestIO(unittest.TestCase):
         buffer = StringIO()
         with buffer as f:
             export_to_blif(f)
-            self.assertEqual(
-                buffer.getvalue(),
-                blif_example_1
+            self.assertListEqual(
+                buffer.getvalue().splitlines(),
+                blif_example_1.splitlines()
             )
+            self.assertTrue(buffer.getvalue().endswith('.end\n'))
 
 
 if __name__ == "__main__":
@@ -1,19 +1,33 @@
 import unittest
 import random
 
-from pylse import working_circuit, inp, inp_at, Simulation, SFQ, Wire, PylseError
+import numpy as np
+
+from pylse import working_circuit, inp, inp_at, Simulation, SFQ, Wire, PylseError, delay
 from pylse import jtl, c, c_inv, m, s, dro, dro_sr, dro_c, inv, and_s, or_s, xor_s, \
                   xnor_s, nor_s, nand_s, split, jtl_chain
+from pylse.testing import assert_events_equal
+from pylse.uppaal import PyLSENTA
+
+
+# Shared across tests; each setUp resets it rather than building a new one.
+sim = Simulation()
 
 
-def delay(wire):
-    return working_circuit()._src_map[wire].element.firing_delay
+class PylseTestCase(unittest.TestCase):
+    def assertEvents(self, events, expected):
+        ''' Check that the simulated events match the expected ones, wire by wire.
 
+        Times are compared as float64 arrays, to within an absolute tolerance of 1e-9.
+        '''
+        assert_events_equal(events, expected, atol=1e-9)
 
-class TestCellsSetup(unittest.TestCase):
+
+class TestCellsSetup(PylseTestCase):
     # Just for checking we can set arbitrary parameters and override class defaults
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
     def test_jtl_custom(self):
         in0 = inp(period=3.0, n=2, name='in0')
@@ -34,9 +48,10 @@ class TestCellsSetup(unittest.TestCase):
 
 # Most of these tests assume/set a transition time of 0, because we're just
 # testing that the state machines respond to inputs correctly.
-class TestAsynchronousCells(unittest.TestCase):
+class TestAsynchronousCells(PylseTestCase):
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
     def test_jtl(self):
         in_period = 3.0
@@ -44,9 +59,8 @@ class TestAsynchronousCells(unittest.TestCase):
         in0 = inp(period=in_period, n=in_n, name='in0')
         jtl_out = jtl(in0, name='jtl_out')
         jtl_delay = delay(jtl_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [i * in_period for i in range(in_n)],
             'jtl_out': [t + jtl_delay for t in events['in0']]
         })
@@ -61,15 +75,36 @@ class TestAsynchronousCells(unittest.TestCase):
         self.assertEqual(jtl_1.name, 'jtl1')
         self.assertEqual(jtl_0.name, 'jtl0')
 
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [0.0, 3.0, 4.0],
             'jtl0': [t + firing_delay for t in events['in0']],
             'jtl1': [t + firing_delay for t in events['jtl0']],
             'jtl_out': [t + firing_delay for t in events['jtl1']],
         })
 
+    def test_jtl_chain_fused(self):
+        in0 = inp_at(0.0, 3.0, 4.0, name='in0')
+        firing_delay = 4.2
+        jtl_out = jtl_chain(in0, 3, firing_delay=firing_delay, names='jtl1 jtl_out', fused=True)
+        node = working_circuit()._src_map[jtl_out]
+        self.assertEqual(len(working_circuit().nodes), 3)  # _Source, InGen, fused chain
+        self.assertEqual([w.name for w in node.output_wires], ['_0', 'jtl1', 'jtl_out'])
+        self.assertEqual(node.element.jjs, 6)
+
+        events = sim.simulate()
+        self.assertEvents(events, {
+            'in0': [0.0, 3.0, 4.0],
+            'jtl1': [t + 2 * firing_delay for t in events['in0']],
+            'jtl_out': [t + 3 * firing_delay for t in events['in0']],
+        })
+
+    def test_jtl_chain_fused_not_exportable(self):
+        jtl_chain(inp_at(0.0, name='in0'), 3, names='jtl_out', fused=True)
+        with self.assertRaises(PylseError) as ex:
+            PyLSENTA(working_circuit())._create_sfq_ta()
+        self.assertIn("fused JTL chains are not supported", str(ex.exception))
+
     def test_c(self):
         in0_times = [2.0, 4.0, 13.0]
         in1_times = [5.0, 14.0]
@@ -77,9 +112,8 @@ class TestAsynchronousCells(unittest.TestCase):
         in1 = inp_at(*in1_times, name='in1')
         c_out = c(in0, in1, name='c_out')
         c_delay = delay(c_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': in0_times,
             'in1': in1_times,
             'c_out': [5.0 + c_delay, 14.0 + c_delay]
@@ -90,9 +124,8 @@ class TestAsynchronousCells(unittest.TestCase):
         in1 = inp(start=18.0, period=10, n=2, name='in1')
         c_inv_out = c_inv(in0, in1, name='c_inv_out')
         c_inv_delay = delay(c_inv_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [2.0, 4.0, 6.0],
             'in1': [18.0, 28.0],
             'c_inv_out': [2.0 + c_inv_delay, 28.0 + c_inv_delay]
@@ -105,9 +138,8 @@ class TestAsynchronousCells(unittest.TestCase):
         in1 = inp_at(*in1_times, name='in1')
         c_inv_out = c_inv(in0, in1, name='c_inv_out')
         c_inv_delay = delay(c_inv_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': in0_times,
             'in1': in1_times,
             'c_inv_out': [2.0 + c_inv_delay, 20.0 + c_inv_delay]
@@ -120,9 +152,8 @@ class TestAsynchronousCells(unittest.TestCase):
         b = inp_at(*b_times, name='b')
         c_inv_out = c_inv(a, b, name='c_inv_out', transition_time=0)
         c_inv_delay = delay(c_inv_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'a': a_times,
             'b': b_times,
             'c_inv_out': [2.0 + c_inv_delay, 8.0 + c_inv_delay, 12.0 + c_inv_delay]
@@ -135,9 +166,8 @@ class TestAsynchronousCells(unittest.TestCase):
         in1 = inp_at(*in1_times, name='in1')
         c_inv_out = c_inv(in0, in1, name='c_inv_out')
         c_inv_delay = delay(c_inv_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': in0_times,
             'in1': in1_times,
             'c_inv_out': [2.0 + c_inv_delay, 12.0 + c_inv_delay, 23.0 + c_inv_delay]
@@ -150,13 +180,12 @@ class TestAsynchronousCells(unittest.TestCase):
         in1 = inp(period=in_period[1], n=in_n[1], name='in1')
         m_out = m(in0, in1, name='m_out', transition_time=0)
         m_delay = delay(m_out)
-        sim = Simulation()
         events = sim.simulate()
         # NOTE: There are simultaneous events on both of m's incoming ports at
         # time 6.0, and so two outputs (since it transitions and produces output
         # once for each input). When/if we had hold transition_time constraints
         # on this particular cell, this may instead be an error.
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [i * in_period[0] for i in range(in_n[0])],
             'in1': [i * in_period[1] for i in range(in_n[1])],
             'm_out': [t + m_delay for t in sorted(events['in0'] + events['in1'])]
@@ -168,9 +197,8 @@ class TestAsynchronousCells(unittest.TestCase):
         in0 = inp(period=in_period, n=in_n, name='in0')
         s_out0, _s_out1 = s(in0, left_name='s_out0', right_name='s_out1')
         s_delay = delay(s_out0)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [i * in_period for i in range(in_n)],
             's_out0': [t + s_delay for t in events['in0']],
             's_out1': [t + s_delay for t in events['in0']]
@@ -189,9 +217,8 @@ class TestAsynchronousCells(unittest.TestCase):
         #     / \
         #   clk2 clk3
         s_delay = delay(clk1)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'clk': [i * iperiod for i in range(n)],
             'clk1': [t + s_delay for t in events['clk']],
             'clk2': [t + s_delay for t in events['clk1']],
@@ -202,19 +229,38 @@ class TestAsynchronousCells(unittest.TestCase):
         self.assertEqual(clk2.name, 'clk2')
         self.assertEqual(clk3.name, 'clk3')
 
+    def test_split_flat(self):
+        iperiod = 5.0
+        n = 4
+        clk = inp(period=iperiod, n=n, name='clk')
+        clk1, clk2, clk3 = split(clk, 3, names='clk1 clk2 clk3', flat=True)
+        node = working_circuit()._src_map[clk1]
+        self.assertEqual(node.output_wires, [clk1, clk2, clk3])
+        self.assertEqual(node.element.jjs, 6)
+        other = working_circuit()._src_map[split(inp(), 3, flat=True)[0]]
+        self.assertIs(type(other.element), type(node.element))
+        s_delay = delay(clk1)
+        events = sim.simulate()
+        self.assertEvents(events, {
+            'clk': [i * iperiod for i in range(n)],
+            'clk1': [t + s_delay for t in events['clk']],
+            'clk2': [t + s_delay for t in events['clk']],
+            'clk3': [t + s_delay for t in events['clk']],
+        })
+
 
-class TestFlipFlopCells(unittest.TestCase):
+class TestFlipFlopCells(PylseTestCase):
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
     def test_dro(self):
         in0 = inp_at(2.0, 2.5, 6.0, name='in0')
         clk = inp(start=5.3, period=6, n=3, name='clk')
         dro_out = dro(in0, clk, name='dro_out')
         dro_delay = delay(dro_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [2.0, 2.5, 6.0],
             'clk': [5.3, 11.3, 17.3],
             'dro_out': [5.3 + dro_delay, 11.3 + dro_delay]
@@ -226,9 +272,8 @@ class TestFlipFlopCells(unittest.TestCase):
         clk = inp(start=5.0, period=5, n=2, name='clk')
         dro_sr_out = dro_sr(set, rst, clk, name='dro_sr_out')
         dro_sr_delay = delay(dro_sr_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'set': [3.0, 6.0],
             'rst': [7.0],
             'clk': [5.0, 10.0],
@@ -241,9 +286,8 @@ class TestFlipFlopCells(unittest.TestCase):
         clk = inp(start=5.0, period=5, n=4, name='clk')
         dro_c_out0, _dro_c_out1 = dro_c(in0, clk, name_q='dro_c_q', name_q_not='dro_c_q_not')
         dro_c_delay = delay(dro_c_out0)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [2.0, 4.0, 6.0],
             'clk': [5.0, 10.0, 15.0, 20.0],
             'dro_c_q': [15.0 + dro_c_delay, 20.0 + dro_c_delay],
@@ -256,9 +300,8 @@ class TestFlipFlopCells(unittest.TestCase):
         c = inp_at(78.0, 104.0, name='ci')
         dro_c_out, _ = dro_c(d, c, name_q='out', name_q_not='nout')
         dro_c_delay = delay(dro_c_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'di': [50.0],
             'ci': [78.0, 104.0],
             'out': [104.0 + dro_c_delay],
@@ -266,9 +309,10 @@ class TestFlipFlopCells(unittest.TestCase):
         })
 
 
-class TestSynchronousCells(unittest.TestCase):
+class TestSynchronousCells(PylseTestCase):
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
     def test_inv_normal(self):
         # Currently testing based off of 1.2 setup time, 5.0 hold time
@@ -279,9 +323,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp(start=10.0, period=10.0, n=3, name='clk')
         inv_out = inv(in0, clk, name='inv_out')
         inv_delay = delay(inv_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [2.0, 4.0, 16.2],
             'clk': [10.0, 20.0, 30.0],
             'inv_out': [30.0 + inv_delay]
@@ -298,7 +341,6 @@ class TestSynchronousCells(unittest.TestCase):
         in0 = inp_at(5.0, name='in0')
         clk = inp_at(6.0, name='clk')
         _inv_out = inv(in0, clk, name='inv_out')
-        sim = Simulation()
         with self.assertRaises(PylseError) as ex:
             _events = sim.simulate()
         self.assertEqual(
@@ -322,10 +364,9 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(3.0, name='clk')
         inv_out = inv(in0, clk, name='inv_out')
         inv_delay = delay(inv_out)
-        sim = Simulation()
         with self.assertRaises(PylseError) as ex:
             events = sim.simulate()
-            self.assertEqual(events, {
+            self.assertEvents(events, {
                 'in0': [1.0, 6.0],
                 'clk': [3.0],
                 'inv_out': [3.0 + inv_delay]
@@ -345,7 +386,6 @@ class TestSynchronousCells(unittest.TestCase):
         in0 = inp_at(2.0, name='in0')
         clk = inp_at(2.0, name='clk')
         _inv_out = inv(in0, clk, name='inv_out')
-        sim = Simulation()
         with self.assertRaises(PylseError) as ex:
             _events = sim.simulate()
         self.assertEqual(
@@ -365,9 +405,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(*clk_times, name='clk')
         and_out = and_s(in0, in1, clk, name='and_out')
         and_s_delay = delay(and_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': in0_times,
             'in1': in1_times,
             'clk': clk_times,
@@ -382,7 +421,6 @@ class TestSynchronousCells(unittest.TestCase):
         in1 = inp_at(*in1_times, name='in1')
         clk = inp_at(*clk_times, name='clk')
         _and_out = and_s(in0, in1, clk, name='and_out')
-        sim = Simulation()
         with self.assertRaises(PylseError) as ex:
             _events = sim.simulate()
         self.assertEqual(
@@ -401,9 +439,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(10.0, 18.0, 32.0, name='clk')
         or_out = or_s(in0, in1, clk, name='or_out')
         or_s_delay = delay(or_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [4.0, 12.0],
             'in1': [3.0, 11.0, 18.1],
             'clk': [10.0, 18.0, 32.0],
@@ -416,9 +453,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(7.0, name='clk')
         or_out = or_s(in0, in1, clk, name='or_out')
         or_s_delay = delay(or_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [1.0],
             'in1': [1.0],
             'clk': [7.0],
@@ -431,9 +467,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(3, 10, 18, 23, 28, 35, 43, name='clk')
         xor_out = xor_s(in0, in1, clk, name='xor_out', transition_time=0, past_constraints=0)
         xor_s_delay = delay(xor_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [5.0, 7.0, 20.0, 30.0, 40.0],
             'in1': [13.0, 15.0, 25.0, 33.0, 38.0],
             'clk': [3.0, 10.0, 18.0, 23.0, 28.0, 35.0, 43.0],
@@ -447,9 +482,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(50, 100, 150, name='clk')
         nand_out = nand_s(in0, in1, clk, name='nand_out')
         nand_delay = delay(nand_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [0, 75],
             'in1': [85],
             'clk': [50, 100, 150],
@@ -462,9 +496,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(50, 100, 150, name='clk')
         xnor_out = xnor_s(in0, in1, clk, name='xnor_out')
         xnor_delay = delay(xnor_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [0, 75],
             'in1': [85],
             'clk': [50, 100, 150],
@@ -477,9 +510,8 @@ class TestSynchronousCells(unittest.TestCase):
         clk = inp_at(50, 100, 150, name='clk')
         nor_out = nor_s(in0, in1, clk, name='nor_out')
         nor_delay = delay(nor_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in0': [0, 75],
             'in1': [85],
             'clk': [50, 100, 150],
@@ -487,9 +519,10 @@ class TestSynchronousCells(unittest.TestCase):
         })
 
 
-class TestCombinations(unittest.TestCase):
+class TestCombinations(PylseTestCase):
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
     def test_medium(self):
         i1 = inp(name="in1")
@@ -500,9 +533,8 @@ class TestCombinations(unittest.TestCase):
         jdelay = delay(j)
         merge_out = m(i2, j, name="m_out")
         mdelay = delay(merge_out)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'in1': [0.0],
             'in2': [0.0],
             'j0': [(t + jdelay) for t in events['in1']],
@@ -522,9 +554,8 @@ class TestCombinations(unittest.TestCase):
         _m = m(ins12, ins22, name='m', transition_time=0)
         delay1 = delay(_c) + delay(ins11)
         delay2 = delay(_m) + delay(ins11)
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'ins1': ins1_times,
             'ins2': ins2_times,
             'c': [1.0 + delay1, 6.0 + delay1, 13.0 + delay1],  # Note, the 4.0 from ins1 is ignored
@@ -534,16 +565,22 @@ class TestCombinations(unittest.TestCase):
         })
 
 
-class TestVariableDelays(unittest.TestCase):
+class TestVariableDelays(PylseTestCase):
     min_factor = 0.8
     max_factor = 1.2
 
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
-    def check_valid(self, value, time, delay, lower_factor=min_factor, upper_factor=max_factor):
-        self.assertTrue(value >= (time + delay) * lower_factor)
-        self.assertTrue(value <= (time + delay) * upper_factor)
+    def check_all(self, values, times, delay, lower_factor=min_factor, upper_factor=max_factor):
+        expected = np.asarray(times, dtype=np.float64) + delay
+        values = np.asarray(values, dtype=np.float64)
+        self.assertEqual(values.shape, expected.shape)
+        in_window = (values >= expected * lower_factor) & (values <= expected * upper_factor)
+        self.assertTrue(np.all(in_window),
+                        f"{values.tolist()} not within [{lower_factor}, {upper_factor}] "
+                        f"of {expected.tolist()}")
 
     @unittest.skip("This fails...ocassionally, which is telling since we're testing variability.")
     def test_variability_c_element(self):
@@ -551,46 +588,35 @@ class TestVariableDelays(unittest.TestCase):
         j = inp_at(2.0, 10.0)
         _c = c(i, j, name='c')
         c_delay = delay(_c)
-        sim = Simulation()
         events = sim.simulate(variability=True)
         self.assertEqual(len(events['c']), 2)
-        self.check_valid(events['c'][0], 2.0, c_delay)
-        self.check_valid(events['c'][1], 10.0, c_delay)
+        self.check_all(events['c'], [2.0, 10.0], c_delay)
 
     def test_variability_c_inv_element(self):
         i = inp_at(6.0, 10.0, 12.0)
         j = inp_at(2.0, 4.0, 8.0, 16.0)
         _c = c_inv(i, j, name='c_inv', transition_time=0)
         c_inv_delay = delay(_c)
-        sim = Simulation()
         events = sim.simulate(variability=True)
         self.assertEqual(len(events['c_inv']), 3)
-        self.check_valid(events['c_inv'][0], 2.0, c_inv_delay)
-        self.check_valid(events['c_inv'][1], 8.0, c_inv_delay)
-        self.check_valid(events['c_inv'][2], 12.0, c_inv_delay)
+        self.check_all(events['c_inv'], [2.0, 8.0, 12.0], c_inv_delay)
 
     def test_variability_m_element(self):
         i = inp_at(1.0, 10.0)
         j = inp_at(2.0, 8.0)
         _m = m(i, j, name='m', transition_time=0)
         m_delay = delay(_m)
-        sim = Simulation()
         events = sim.simulate(variability=True)
         self.assertEqual(len(events['m']), 4)
-        self.check_valid(events['m'][0], 1.0, m_delay)
-        self.check_valid(events['m'][1], 2.0, m_delay)
-        self.check_valid(events['m'][2], 8.0, m_delay)
-        self.check_valid(events['m'][3], 10.0, m_delay)
+        self.check_all(events['m'], [1.0, 2.0, 8.0, 10.0], m_delay)
 
     def test_variability_jtl_element(self):
         i = inp_at(1.0, 10.0)
         _j = jtl(i, name='j')
         j_delay = delay(_j)
-        sim = Simulation()
         events = sim.simulate(variability=True)
         self.assertEqual(len(events['j']), 2)
-        self.check_valid(events['j'][0], 1.0, j_delay)
-        self.check_valid(events['j'][1], 10.0, j_delay)
+        self.check_all(events['j'], [1.0, 10.0], j_delay)
 
     def test_variability_custom_function(self):
         def custom_variability(delay, _node):
@@ -600,16 +626,15 @@ class TestVariableDelays(unittest.TestCase):
         i = inp_at(1.0, 10.0)
         _j = jtl(i, name='j')
         j_delay = delay(_j)
-        sim = Simulation()
         events = sim.simulate(variability=custom_variability)
         self.assertEqual(len(events['j']), 2)
-        self.check_valid(events['j'][0], 1.0, j_delay, lower_factor=0.5, upper_factor=1.5)
-        self.check_valid(events['j'][1], 10.0, j_delay, lower_factor=0.5, upper_factor=1.5)
+        self.check_all(events['j'], [1.0, 10.0], j_delay, lower_factor=0.5, upper_factor=1.5)
 
 
-class TestFakeSFQForTimeConstraints(unittest.TestCase):
+class TestFakeSFQForTimeConstraints(PylseTestCase):
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
     def test_default_transition_time_automatically_added(self):
         class Simple(SFQ):
@@ -630,9 +655,8 @@ class TestFakeSFQForTimeConstraints(unittest.TestCase):
         s = Simple()
         self.assertEqual(s.get_transition_by_id('1').transition_time, 2.7)
         working_circuit().add_node(s, [i], [o])
-        sim = Simulation()
         events = sim.simulate()
-        self.assertEqual(events, {
+        self.assertEvents(events, {
             'i': [0.0, 3.0],
             'o': [3.0],
         })
@@ -654,7 +678,6 @@ class TestFakeSFQForTimeConstraints(unittest.TestCase):
         i = inp_at(0.0, 2.0, 3.0)
         o = Wire('o')
         working_circuit().add_node(Simple(), [i], [o])
-        sim = Simulation()
         with self.assertRaises(PylseError) as ex:
             sim.simulate()
         self.assertEqual(
@@ -1,16 +1,22 @@
 from pylse.pylse_exceptions import PylseError
+import io
 import unittest
 
-from pylse import inp, inp_at, working_circuit, c, m, s, Simulation, Wire, Transitional
+from pylse import inp, inp_at, working_circuit, c, m, s, jtl, Simulation, Wire, Transitional
 try:
     from .test_sfq_cells import delay
 except ImportError:
     from test_sfq_cells import delay
 
 
+# Shared across tests; each setUp resets it rather than building a new one.
+sim = Simulation()
+
+
 class TestSimulation(unittest.TestCase):
     def setUp(self):
         working_circuit().reset()
+        sim.reset()
 
     def test_an_input_doesnt_fire(self):
         in0 = inp_at(name='in0')
@@ -21,7 +27,6 @@ class TestSimulation(unittest.TestCase):
         mout = m(in01, in11, name='m', transition_time=0)
         _c = c(in02, in12, name='c', transition_time=0)
         d = delay(in01) + delay(mout)
-        sim = Simulation()
         events = sim.simulate()
         self.assertEqual(events, {
             'in0': [],
@@ -32,10 +37,81 @@ class TestSimulation(unittest.TestCase):
 
     def test_no_events_no_named_wires(self):
         _in0 = inp(1.2)
-        sim = Simulation()
         events = sim.simulate()
         self.assertDictEqual(events, {})
 
+    def test_reset_keeps_previous_results(self):
+        inp_at(1.0, 2.0, name='in0')
+        events = sim.simulate()
+        heap = sim.pulse_heap
+        sim.reset()
+        self.assertIs(sim.pulse_heap, heap)
+        self.assertEqual(sim.pulse_heap, [])
+        self.assertEqual(sim.now, 0.0)
+        self.assertEqual(sim.events_to_plot, {})
+        self.assertEqual(events, {'in0': [1.0, 2.0]})
+
+    def test_simultaneous_pulses_pop_in_insertion_order(self):
+        a, b, c = Wire('c'), Wire('b'), Wire('a')
+        sim.add_pulse(2.0, a)
+        sim.add_pulse(1.0, b)
+        sim.add_pulse(2.0, b)
+        sim.add_pulse(2.0, c)
+        popped = [sim._pop_pulse() for _ in range(4)]
+        self.assertEqual([(p.time, p.wire) for p in popped],
+                         [(1.0, b), (2.0, a), (2.0, b), (2.0, c)])
+
+    def test_input_streams_merged_lazily(self):
+        inp_at(5.0, 1.0, 3.0, name='in0')
+        inp_at(2.0, 2.0, 4.0, name='in1')
+        sizes = []
+        pop_pulse = sim._pop_pulse
+
+        def tracking_pop():
+            sizes.append(len(sim.pulse_heap))
+            return pop_pulse()
+        sim._pop_pulse = tracking_pop
+        try:
+            events = sim.simulate()
+        finally:
+            del sim._pop_pulse
+        self.assertEqual(events, {'in0': [1.0, 3.0, 5.0], 'in1': [2.0, 2.0, 4.0]})
+        self.assertLessEqual(max(sizes), 2)
+
+    def test_event_arrays(self):
+        inp_at(2.0, 4.0, name='in0')
+        inp_at(1.0, 3.0, name='in1')
+        events = sim.simulate()
+        times, ixs = sim.event_arrays()
+        self.assertEqual(times.tolist(), [1.0, 2.0, 3.0, 4.0])
+        names = [sim.observed_names[ix] for ix in ixs]
+        self.assertEqual(names, ['in1', 'in0', 'in1', 'in0'])
+        self.assertEqual(events, {'in0': [2.0, 4.0], 'in1': [1.0, 3.0]})
+
+    def test_sink_pulses_drained_like_dispatched(self):
+        in0 = inp_at(1.0, 2.0, 30.0, 40.0, name='in0')
+        j = jtl(in0, name='j')
+        inp_at(3.0, 50.0, name='in1')
+        d = delay(j)
+        for until in (None, 20.0, 35.0):
+            # Logging turns off draining the sink-bound pulses without dispatching them
+            expected = sim.simulate(until=until, log=io.StringIO())
+            self.assertEqual(sim.simulate(until=until), expected)
+        # The pulse at 35.7 is still handled, since the loop checks `until` before each step
+        self.assertEqual(expected, {
+            'in0': [1.0, 2.0, 30.0],
+            'j': [1.0 + d, 2.0 + d, 30.0 + d],
+            'in1': [3.0],
+        })
+
+    def test_output_wires_by_name(self):
+        in0 = inp_at(1.0, name='in0')
+        l, r = s(in0, left_name='l', right_name='r')
+        node = working_circuit()._src_map[l]
+        events = sim.simulate()
+        self.assertEqual(sim._output_wires[node], {'l': l, 'r': r})
+        self.assertEqual(events['l'], events['r'])
+
     def test_input_arrives_during_setup(self):
         class Simple(Transitional):
             inputs = ['a']
@@ -49,7 +125,6 @@ class TestSimulation(unittest.TestCase):
         i = inp_at(0.0, 3.0)
         o = Wire('o')
         working_circuit().add_node(Simple(), [i], [o])
-        sim = Simulation()
         with self.assertRaises(PylseError) as ex:
             sim.simulate()
         self.assertEqual(
@@ -74,7 +149,6 @@ class TestSimulation(unittest.TestCase):
         o = Wire('o')
         s = Simple()
         working_circuit().add_node(s, [i], [o])
-        sim = Simulation()
         events = sim.simulate()
         self.assertEqual(events, {
             'i': [0.0, 5.0],
@@ -98,7 +172,6 @@ class TestSimulation(unittest.TestCase):
         bi = inp_at(2.0, name='b')
         o = Wire(name='o')
         working_circuit().add_node(atb, [ai, bi], [o])
-        sim = Simulation()
         with self.assertRaises(PylseError) as ex:
             sim.simulate()
         self.assertEqual(
@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from pylse.testing import assert_events_equal
+
+
+class TestAssertEventsEqual(unittest.TestCase):
+    def test_lists_and_arrays(self):
+        assert_events_equal({'a': [1.0, 2.5], 'b': []}, {'a': np.array([1, 2.5]), 'b': []})
+
+    def test_tolerance(self):
+        events = {'a': [0.1 + 0.2]}
+        with self.assertRaises(AssertionError):
+            assert_events_equal(events, {'a': [0.3]})
+        assert_events_equal(events, {'a': [0.3]}, atol=1e-9)
+
+    def test_mismatch(self):
+        with self.assertRaises(AssertionError) as ex:
+            assert_events_equal({'a': [1.0]}, {'b': [1.0]})
+        self.assertEqual(str(ex.exception),
+                         "Events are on different wires: got ['a'], expected ['b']")
+        with self.assertRaises(AssertionError):
+            assert_events_equal({'a': [1.0]}, {'a': [1.0, 2.0]})
+        with self.assertRaises(AssertionError):
+            assert_events_equal({'a': [1.0]}, {'a': [2.0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
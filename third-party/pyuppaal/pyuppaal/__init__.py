@@ -1 +1 @@
-from pyuppaal import *
+from .pyuppaal import *
@@ -19,10 +19,19 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <http://www.gnu.org/licenses/>. """
 
+import functools
 import html
-import xml.etree.cElementTree as ElementTree
+import io
+import itertools
+try:
+    from lxml import etree as ElementTree
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+    HAVE_LXML = False
 import subprocess
 import re
+import shlex
 import tempfile, os
 import math
 
@@ -37,7 +46,35 @@ def require_keyword_args(num_unnamed):
         return check_call
     return real_decorator
 
+def int_or_none(text):
+    if text != None:
+        return int(text)
+    return None
+
+@functools.lru_cache(maxsize=256)
+def escape_text(text):
+    """Escape text to be used as an element's content.
+
+    Quotes only need escaping inside attribute values, so they are kept as is.
+    The same declarations and labels are escaped on every to_xml, so the
+    results are cached."""
+    return html.escape(text, quote=False)
+
+def dot2uppaalcoords(pos):
+    """Convert a dot "x,y" position to UPPAAL coordinates"""
+    (x, y) = pos.split(',')
+    return (int(-float(x)*1.5), int(-float(y)*1.5))
+
+pygraphviz = None
+def get_pygraphviz():
+    """Import pygraphviz on first use; it is only needed for layout"""
+    global pygraphviz
+    if pygraphviz is None:
+        import pygraphviz
+    return pygraphviz
+
 UPPAAL_LINEHEIGHT = 15
+
 class NTA:
     def __init__(self, declaration="", system="", templates=None):
         self.declaration = declaration
@@ -52,16 +89,14 @@ class NTA:
         return [t for t in self.templates if t.name == tname][0]
 
     def to_xml(self):
-        templatesxml = ""
-        for t in self.templates:
-            templatesxml += t.to_xml() + "\n"
-        return """<?xml version="1.0" encoding="utf-8"?>
+        templatesxml = "".join([t.to_xml() + "\n" for t in self.templates])
+        return f"""<?xml version="1.0" encoding="utf-8"?>
 <!DOCTYPE nta PUBLIC "-//Uppaal Team//DTD Flat System 1.1//EN" "http://www.it.uu.se/research/group/darts/uppaal/flat-1_1.dtd">
 <nta>
-  <declaration>%s</declaration>
-  %s
-  <system>%s</system>
-</nta>""" % (html.escape(self.declaration), templatesxml, html.escape(self.system))
+  <declaration>{escape_text(self.declaration)}</declaration>
+  {templatesxml}
+  <system>{escape_text(self.system)}</system>
+</nta>"""
     @classmethod
     def from_xml(cls, xmlsock):
         nta = cls()
@@ -69,90 +104,111 @@ class NTA:
         return nta
 
     def _from_xml(self, xmlsock):
-        xmldoc = ElementTree.ElementTree(file=xmlsock).getroot()
-
-        def int_or_none(text):
-            if text != None:
-                return int(text)
-            return None
-
-        #ntaxml = xmldoc.getElementsByTagName("nta")[0]
-        ntaxml = xmldoc
+        #Stream the templates, so only one of them is kept in memory at a time
+        if HAVE_LXML:
+            if isinstance(xmlsock, io.TextIOBase):
+                #lxml only reads bytes
+                xmlsock = getattr(xmlsock, 'buffer', None) or \
+                    io.BytesIO(xmlsock.read().encode('utf-8'))
+            context = ElementTree.iterparse(xmlsock, events=('end',), tag='template')
+        else:
+            context = ElementTree.iterparse(xmlsock, events=('end',))
+        self.templates = []
+        for (_, templatexml) in context:
+            if templatexml.tag != 'template':
+                continue
+            self.templates += [self._parse_template(templatexml)]
+            templatexml.clear()
+            if HAVE_LXML:
+                #Drop the templates already parsed; keep the nta's declaration
+                while templatexml.getprevious() is not None and \
+                        templatexml.getprevious().tag == 'template':
+                    del templatexml.getparent()[templatexml.getparent().index(templatexml) - 1]
+
+        ntaxml = context.root
         self.declaration = ntaxml.findtext('declaration') or ""
         self.system = ntaxml.findtext('system') or ""
-        self.templates = []
-        for templatexml in ntaxml.getiterator("template"):
-            locations = {}
-            for locationxml in templatexml.getiterator("location"):
-                name = locationxml.findtext("name")
-                location = Location(id=locationxml.get('id'),
-                    xpos=int(locationxml.get('x', 0)),
-                    ypos=int(locationxml.get('y', 0)), name=name)
-                namexml = locationxml.find('name')
-                if namexml != None:
-                    (location.name.xpos, location.name.ypos) = \
-                        (int_or_none(namexml.get('x', None)),
-                        int_or_none(namexml.get('y', None))
-                        )
-                if locationxml.find("committed") != None:
-                    location.committed = True
-                if locationxml.find("urgent") != None:
-                    location.urgent = True
-                for labelxml in locationxml.getiterator("label"):
-                    if labelxml.get('kind') == 'invariant':
-                        location.invariant = Label("invariant", labelxml.text)
-                        location.invariant.xpos = int_or_none(labelxml.get('x', None))
-                        location.invariant.ypos = int_or_none(labelxml.get('y', None))
-                    elif labelxml.get('kind') == 'exponentialrate':
-                        location.exprate = Label("exponentialrate", labelxml.text)
-                        location.exprate.xpos = int_or_none(labelxml.get('x', None))
-                        location.exprate.ypos = int_or_none(labelxml.get('y', None))
-                    #TODO other labels
-                locations[location.id] = location
-            for branchpointxml in templatexml.getiterator("branchpoint"):
-                branchpoint = Branchpoint(id=branchpointxml.get('id'),
-                    xpos=int_or_none(branchpointxml.get('x', None)),
-                    ypos=int_or_none(branchpointxml.get('y', None)))
-                locations[branchpoint.id] = branchpoint
-            transitions = []
-            for transitionxml in templatexml.getiterator("transition"):
-                transition = Transition(
-                    locations[transitionxml.find('source').get('ref')],
-                    locations[transitionxml.find('target').get('ref')],
-                    )            
-                transition.controllable = ('controllable', 'false') not in list(transitionxml.items())
-                if 'action' in list(transitionxml.keys()):
-                    l = [s[1] for s in list(transitionxml.items()) if s[0] == 'action']
-                    transition.action = l[0]
-                else:
-                    transition.action = None
-                for labelxml in transitionxml.getiterator("label"):
-                    if labelxml.get('kind') in ['select', 'guard', 'assignment', 
-                                                'synchronisation']:
-                        label = getattr(transition, labelxml.get('kind'))
-                        label.value = labelxml.text
-                        label.xpos = int_or_none(labelxml.get('x', None))
-                        label.ypos = int_or_none(labelxml.get('y', None))
-                for nailxml in transitionxml.getiterator("nail"):
-                    transition.nails += [
-                        Nail(int_or_none(nailxml.get('x', None)), 
-                            int_or_none(nailxml.get('y', None)))]
-                transitions += [transition]
-
-            declaration = templatexml.findtext("declaration") or ""
-            parameter = templatexml.findtext("parameter") or ""
-
-            if templatexml.find("init") != None:
-                initlocation=locations[templatexml.find("init").get('ref')]
+
+    def _parse_template(self, templatexml):
+        #Sort the template's children by tag in one pass; the locations and
+        #branchpoints have to be known before the transitions referring to them
+        children = {'location': [], 'branchpoint': [], 'transition': []}
+        for childxml in templatexml:
+            if childxml.tag in children:
+                children[childxml.tag] += [childxml]
+
+        locations = {}
+        for locationxml in children['location']:
+            name = locationxml.findtext("name")
+            location = Location(id=locationxml.get('id'),
+                xpos=int(locationxml.get('x', 0)),
+                ypos=int(locationxml.get('y', 0)), name=name)
+            namexml = locationxml.find('name')
+            if namexml != None:
+                (location.name.xpos, location.name.ypos) = \
+                    (int_or_none(namexml.get('x', None)),
+                    int_or_none(namexml.get('y', None))
+                    )
+            if locationxml.find("committed") != None:
+                location.committed = True
+            if locationxml.find("urgent") != None:
+                location.urgent = True
+            for labelxml in locationxml.findall("label"):
+                if labelxml.get('kind') == 'invariant':
+                    location.invariant = Label("invariant", labelxml.text)
+                    location.invariant.xpos = int_or_none(labelxml.get('x', None))
+                    location.invariant.ypos = int_or_none(labelxml.get('y', None))
+                elif labelxml.get('kind') == 'exponentialrate':
+                    location.exprate = Label("exponentialrate", labelxml.text)
+                    location.exprate.xpos = int_or_none(labelxml.get('x', None))
+                    location.exprate.ypos = int_or_none(labelxml.get('y', None))
+                #TODO other labels
+            locations[location.id] = location
+        for branchpointxml in children['branchpoint']:
+            branchpoint = Branchpoint(id=branchpointxml.get('id'),
+                xpos=int_or_none(branchpointxml.get('x', None)),
+                ypos=int_or_none(branchpointxml.get('y', None)))
+            locations[branchpoint.id] = branchpoint
+        transitions = []
+        for transitionxml in children['transition']:
+            transition = Transition(
+                locations[transitionxml.find('source').get('ref')],
+                locations[transitionxml.find('target').get('ref')],
+                )            
+            transition.controllable = ('controllable', 'false') not in list(transitionxml.items())
+            if 'action' in list(transitionxml.keys()):
+                l = [s[1] for s in list(transitionxml.items()) if s[0] == 'action']
+                transition.action = l[0]
             else:
-                initlocation = None
-            template = Template(templatexml.find("name").text,
-                declaration,
-                list(locations.values()),
-                initlocation=initlocation,
-                transitions=transitions,
-                parameter=parameter)
-            self.templates += [template]    
+                transition.action = None
+            labels = {'select': transition.select, 'guard': transition.guard,
+                'assignment': transition.assignment,
+                'synchronisation': transition.synchronisation}
+            for labelxml in transitionxml.findall("label"):
+                label = labels.get(labelxml.get('kind'))
+                if label is not None:
+                    label.value = labelxml.text
+                    label.xpos = int_or_none(labelxml.get('x', None))
+                    label.ypos = int_or_none(labelxml.get('y', None))
+            for nailxml in transitionxml.findall("nail"):
+                transition.nails += [
+                    Nail(int_or_none(nailxml.get('x', None)), 
+                        int_or_none(nailxml.get('y', None)))]
+            transitions += [transition]
+
+        declaration = templatexml.findtext("declaration") or ""
+        parameter = templatexml.findtext("parameter") or ""
+
+        if templatexml.find("init") != None:
+            initlocation=locations[templatexml.find("init").get('ref')]
+        else:
+            initlocation = None
+        return Template(templatexml.find("name").text,
+            declaration,
+            list(locations.values()),
+            initlocation=initlocation,
+            transitions=transitions,
+            parameter=parameter)
 
 class Template:
     def __init__(self, name, declaration="", locations=None, initlocation=None, transitions=None, parameter=None):
@@ -162,6 +218,8 @@ class Template:
         self.transitions = transitions or []
         self.initlocation = initlocation
         self.parameter = parameter
+        #Everything the last layout depended on and set, see _layout_state
+        self._laid_out = None
 
     def assign_ids(self):
         i = 0
@@ -174,7 +232,9 @@ class Template:
         return int(-float(coord)*1.5)
 
     def get_location_by_name(self, name):
-        locs = [l for l in self.locations if l.name.value == name]
+        #Branchpoints share the locations list, but have no name
+        locs = [l for l in self.locations
+            if isinstance(l, Location) and l.name.value == name]
         assert len(locs) == 1
         return locs[0]
     
@@ -182,13 +242,29 @@ class Template:
         for transition in self.transitions:
             transition.sharpen(nailAngleThreshold, nailInterDistanceThreshold)
 
+    def _layout_state(self, args):
+        return (args, self.initlocation,
+            tuple([(l, l.invariant.get_value(), l.xpos, l.ypos, l.name.xpos, l.name.ypos,
+                    l.invariant.xpos, l.invariant.ypos) for l in self.locations]),
+            tuple([(t, t.source, t.target,
+                    tuple([(a.get_value(), a.xpos, a.ypos)
+                        for a in [t.select, t.guard, t.synchronisation, t.assignment]]),
+                    tuple([(n.xpos, n.ypos) for n in t.nails])) for t in self.transitions]))
+
     def layout(self, auto_nails=False, nailAngleThreshold=110.0, nailInterDistanceThreshold=1.0):
-        import pygraphviz
         self.assign_ids()
+        #Laying out again what the last layout left unchanged gives the same result
+        args = (auto_nails, nailAngleThreshold, nailInterDistanceThreshold)
+        if self._laid_out is not None and self._laid_out == self._layout_state(args):
+            return
 
-        G = pygraphviz.AGraph(strict=False)
+        G = get_pygraphviz().AGraph(strict=False)
         #initial node should be the first (dot will place it at the top then)
-        for l in [self.initlocation] + self.locations:
+        added = set()
+        for l in itertools.chain([self.initlocation], self.locations):
+            if l.id in added:
+                continue
+            added.add(l.id)
             G.add_node(l.id)
             node = G.get_node(l.id)
             node.attr['label'] = l.invariant.get_value().replace('\n', '\\n')
@@ -201,18 +277,13 @@ class Template:
                 #add label to first segment
                 if curnode == t.source:
                     edge = G.get_edge(curnode.id, nextnode.id)
-                    label = '';
-                    for a in [t.select, t.guard, t.synchronisation, t.assignment]:
-                        if a.get_value() != None:
-                            label += a.get_value().replace('\n', '\\n')+'\\n'
-                    if len(label) > 0:
-                        label = label[0:len(label)-2]
-                    edge.attr['label'] = label
+                    edge.attr['label'] = '\\n'.join([a.get_value().replace('\n', '\\n')
+                        for a in [t.select, t.guard, t.synchronisation, t.assignment]])
                 curnode = nextnode
         G.layout(prog='dot')
 
         for l in self.locations:
-            (l.xpos, l.ypos) = list(map(self.dot2uppaalcoord, G.get_node(l.id).attr['pos'].split(',')))
+            (l.xpos, l.ypos) = dot2uppaalcoords(G.get_node(l.id).attr['pos'])
             (l.name.xpos, l.name.ypos) = (l.xpos, l.ypos + UPPAAL_LINEHEIGHT)
             (l.invariant.xpos, l.invariant.ypos) = (l.xpos, l.ypos + 2 * UPPAAL_LINEHEIGHT)
         for t in self.transitions:
@@ -226,48 +297,69 @@ class Template:
             if auto_nails:
                 t.nails = []
                 for nailpos in edge.attr['pos'].split(" "):
-                    xpos, ypos = list(map(self.dot2uppaalcoord, nailpos.split(",")))
+                    xpos, ypos = dot2uppaalcoords(nailpos)
                     t.nails += [Nail(xpos, ypos)]
+            (x, y) = dot2uppaalcoords(edge.attr['lp'])
             ydelta = 0
             for a in ['select', 'guard', 'synchronisation', 'assignment']:
                 label = getattr(t, a)
                 if label.get_value() != None:
-                    (x, y) = list(map(self.dot2uppaalcoord, edge.attr['lp'].split(',')))
                     label.xpos = x
                     label.ypos = y+ydelta
                     ydelta += UPPAAL_LINEHEIGHT
         self.sharpenTransitions(nailAngleThreshold, nailInterDistanceThreshold)
+        self._laid_out = self._layout_state(args)
  
 
     def _parameter_to_xml(self):
         if self.parameter:
-            return '<parameter>%s</parameter>' % (html.escape(self.parameter))
+            return f'<parameter>{escape_text(self.parameter)}</parameter>'
         return ""
 
     def to_xml(self):
-        return """  <template>
-    <name x="5" y="5">%s</name>
-    %s
-    <declaration>%s</declaration>
-    %s
-    %s
-    <init ref="%s" />
-    %s
-  </template>""" % (self.name, 
-    self._parameter_to_xml(),
-    html.escape(self.declaration),
-    "\n".join([l.to_xml() for l in self.locations if isinstance(l, Location)]),
-    "\n".join([l.to_xml() for l in self.locations if isinstance(l, Branchpoint)]),
-    self.initlocation.id,
-    "\n".join([l.to_xml() for l in self.transitions]))
+        locationsxml = []
+        branchpointsxml = []
+        for l in self.locations:
+            if isinstance(l, Location):
+                locationsxml += [l.to_xml()]
+            elif isinstance(l, Branchpoint):
+                branchpointsxml += [l.to_xml()]
+        locationsxml = "\n".join(locationsxml)
+        branchpointsxml = "\n".join(branchpointsxml)
+        transitionsxml = "\n".join([l.to_xml() for l in self.transitions])
+        return f"""  <template>
+    <name x="5" y="5">{self.name}</name>
+    {self._parameter_to_xml()}
+    <declaration>{escape_text(self.declaration)}</declaration>
+    {locationsxml}
+    {branchpointsxml}
+    <init ref="{self.initlocation.id}" />
+    {transitionsxml}
+  </template>"""
 
 class Label:
+    __slots__ = ('kind', '_value', '_parts', 'xpos', 'ypos')
+
     def __init__(self, kind, value=None, xpos=None, ypos=None):
         self.kind = kind
         self.value = value
         self.xpos = xpos
         self.ypos = ypos
 
+    #Appended fragments are only joined onto the value when it is next read,
+    #so building up a guard one conjunct at a time isn't quadratic
+    @property
+    def value(self):
+        if self._parts:
+            self._value = "".join([self._value] + self._parts)
+            self._parts = []
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._parts = []
+
     def get_value(self):
         if self.value:
             return self.value
@@ -275,8 +367,8 @@ class Label:
 
     def append(self, expr, auto_newline=True, sep=","):
         nl = auto_newline and '\n' or ''
-        if self.get_value():
-            self.value = self.get_value() + sep + nl + expr
+        if self._value or self._parts:
+            self._parts += [sep + nl, expr]
         else:
             self.value = expr
             
@@ -293,25 +385,26 @@ class Label:
 
     def to_xml(self):
         if self.value:
-            attrs = ['kind="%s"' % self.kind]
+            attrs = [f'kind="{self.kind}"']
             if self.xpos:
-                attrs += ['x="%s"' % self.xpos]
+                attrs += [f'x="{self.xpos}"']
             if self.ypos:
-                attrs += ['y="%s"' % self.ypos]
+                attrs += [f'y="{self.ypos}"']
 
             #special case for location names
             if self.kind == 'name':
-                return '<name %s>%s</name>' % \
-                    (" ".join(attrs[1:]), html.escape(self.value))
+                return f'<name {" ".join(attrs[1:])}>{escape_text(self.value)}</name>'
             else:
-                return '<label %s>%s</label>' % \
-                    (" ".join(attrs), html.escape(self.value))
+                return f'<label {" ".join(attrs)}>{escape_text(self.value)}</label>'
         return ''
 
     def __str__(self):
         return self.get_value()
 
 class Location:
+    __slots__ = ('invariant', 'exprate', 'committed', 'urgent', 'name', 'id', 'oldid',
+        'xpos', 'ypos')
+
     @require_keyword_args(1)
     def __init__(self, invariant=None, urgent=False, committed=False, name=None, id = None,
         xpos=0, ypos=0):
@@ -337,15 +430,16 @@ class Location:
             expratexml = self.exprate.to_xml()
         else:
             expratexml = ""
-        return """
-    <location id="%s" x="%s" y="%s">
-      %s
-      %s
-      %s
-      %s
-      %s
-    </location>""" % (self.id, self.xpos, self.ypos, namexml, invariantxml, expratexml,
-        self.committed and '<committed />' or '', self.urgent and '<urgent />' or '')
+        committedxml = self.committed and '<committed />' or ''
+        urgentxml = self.urgent and '<urgent />' or ''
+        return f"""
+    <location id="{self.id}" x="{self.xpos}" y="{self.ypos}">
+      {namexml}
+      {invariantxml}
+      {expratexml}
+      {committedxml}
+      {urgentxml}
+    </location>"""
 
     def __str__(self):
         if self.name.value:
@@ -354,6 +448,8 @@ class Location:
             return "Location %s" % (self.id,)
 
 class Branchpoint:
+    __slots__ = ('id', 'oldid', 'xpos', 'ypos')
+
     @require_keyword_args(1)
     def __init__(self, id=None, xpos=0, ypos=0):
         self.id = id
@@ -361,12 +457,15 @@ class Branchpoint:
         self.ypos = ypos
 
     def to_xml(self):
-        return """
-    <branchpoint id="%s" x="%s" y="%s" />""" % (self.id, self.xpos, self.ypos)
+        return f"""
+    <branchpoint id="{self.id}" x="{self.xpos}" y="{self.ypos}" />"""
 
 
-last_transition_id = 0
+transition_ids = itertools.count()
 class Transition:
+    __slots__ = ('source', 'target', 'select', 'guard', 'synchronisation', 'assignment',
+        'nails', 'action', 'controllable', 'id')
+
     @require_keyword_args(3)
     def __init__(self, source, target, select='', guard='', synchronisation='',
                     assignment='', action = None, controllable=True):
@@ -380,9 +479,7 @@ class Transition:
         self.action = action
         self.controllable = controllable
 
-        global last_transition_id
-        self.id = 'Transition' + str(last_transition_id)
-        last_transition_id = last_transition_id + 1
+        self.id = 'Transition' + str(next(transition_ids))
 
     def __copy__(self):
         newone = Transition(self.source, self.target, 
@@ -393,80 +490,71 @@ class Transition:
         return newone
 
     def sharpen(self, angleThreshold, lengthThreshold):
+        #Removing a nail only changes the angle at its neighbours, so rather than
+        #rescanning from the first nail, resume at the one before the removed nail
         count = 0
-        while True: # do while? 
-            removed = False
-            nail_to_pos = lambda nail: (nail.xpos, nail.ypos)
-
-            for (prev, curnail, next) in zip(
-                    [(self.source.xpos, self.source.ypos)] + list(map(nail_to_pos, self.nails[:-1])), 
-                    self.nails, 
-                    list(map(nail_to_pos, self.nails[1:])) + [(self.target.xpos, self.target.ypos)]
-                    ):
-                cur = nail_to_pos(curnail)
-                v1 = (prev[0]-cur[0], prev[1]-cur[1])
-                v2 = (next[0]-cur[0], next[1]-cur[1])
-                v1len = (math.sqrt((v1[0]*v1[0])+(v1[1]*v1[1])))
-                v2len = (math.sqrt((v2[0]*v2[0])+(v2[1]*v2[1])))
-                if v1len<lengthThreshold or v2len<lengthThreshold:
-                    self.nails.remove(curnail)
-                    count += 1
-                    removed=True
-                    break
+        i = 0
+        while i < len(self.nails):
+            prev = i > 0 and self.nails[i - 1] or self.source
+            cur = self.nails[i]
+            next = i + 1 < len(self.nails) and self.nails[i + 1] or self.target
+            v1 = (prev.xpos - cur.xpos, prev.ypos - cur.ypos)
+            v2 = (next.xpos - cur.xpos, next.ypos - cur.ypos)
+            v1len = math.hypot(v1[0], v1[1])
+            v2len = math.hypot(v2[0], v2[1])
+            if v1len < lengthThreshold or v2len < lengthThreshold:
+                remove = True
+            else:
                 dot = (v1[0] * v2[0] + v1[1] * v2[1])/(v1len*v2len)
                 #clamp input to between 1...-1
                 dot = max(-1.0, min(dot, 1.0))
-                angle = math.degrees(math.acos(dot))
-                if angle > angleThreshold:
-                    self.nails.remove(curnail)
-                    count += 1
-                    removed=True
-                    break
-            if not removed:
-                break
+                remove = math.degrees(math.acos(dot)) > angleThreshold
+            if remove:
+                del self.nails[i]
+                count += 1
+                i = max(i - 1, 0)
+            else:
+                i += 1
         return count
+
     def to_xml(self):
         if self.action is None:
             action_str = ''
         else:
-            action_str = ' action="' + str(self.action) + '"'
+            action_str = f' action="{self.action}"'
         if self.controllable is False:
             controllable_str = ' controllable="false"'
         else:
             controllable_str = ''
-        return """
-    <transition%s%s>
-      <source ref="%s" />
-      <target ref="%s" />
-      %s
-      %s
-      %s
-      %s
-      %s
-    </transition>""" % (action_str,controllable_str,self.source.id, self.target.id,
-        self.select.to_xml(), self.guard.to_xml(),
-        self.synchronisation.to_xml(), self.assignment.to_xml(),
-        "\n".join([x.to_xml() for x in self.nails])
-        )
+        nailsxml = "\n".join([x.to_xml() for x in self.nails])
+        return f"""
+    <transition{action_str}{controllable_str}>
+      <source ref="{self.source.id}" />
+      <target ref="{self.target.id}" />
+      {self.select.to_xml()}
+      {self.guard.to_xml()}
+      {self.synchronisation.to_xml()}
+      {self.assignment.to_xml()}
+      {nailsxml}
+    </transition>"""
 
     def set_num_nails(self, num):
         self.nails = []
         for i in range(num):
             self.nails += [Nail()]
 
-last_nail_id = 0
+nail_ids = itertools.count()
 class Nail:
+    __slots__ = ('id', 'xpos', 'ypos')
+
     def __init__(self, xpos=0, ypos=0):
-        global last_nail_id
-        self.id = 'Nail' + str(last_nail_id)
-        last_nail_id = last_nail_id + 1
+        self.id = 'Nail' + str(next(nail_ids))
         self.xpos = xpos
         self.ypos = ypos
 
     def to_xml(self):
-        return """
-    <nail x="%s" y="%s" />""" % \
-            (self.xpos, self.ypos)
+        return f"""
+    <nail x="{self.xpos}" y="{self.ypos}" />"""
 
 class QueryFile:
     def __init__(self, q = '', comment = ''):
@@ -478,31 +566,40 @@ class QueryFile:
     def addQuery(self, q, comment=''):
         self.queries += [(q, comment)]
 
-    def saveFile(self, fh):
+    def to_string(self):
         out = ['//This file was generated from pyUppaal'] + \
             ['/*\n' + comment + '*/\n' + (q == '' and '//NO_QUERY' or q) for (q, comment) in self.queries]
-        fh.write("\n\n".join(out))
+        return "\n\n".join(out)
+
+    def saveFile(self, fh):
+        fh.write(self.to_string())
 
-    #XXX tempfile handling is fugly
     #Call deleteTempFile to close and delete the tempfile
     def getTempFile(self):
-        (fileh, path) = tempfile.mkstemp(suffix='.q')
-        file = os.fdopen(fileh)
-        file.close()
-        file = open(path, 'r+w')
+        #Written, then read back, through a single handle
+        file = tempfile.NamedTemporaryFile(mode='w+', suffix='.q', delete=False)
         self.saveFile(file)
-        file.close()
-        file = open(path, 'r')
-        return (file, path)
+        file.flush()
+        file.seek(0)
+        return (file, file.name)
 
     def deleteTempFile(self, file):
         path = file.name
         file.close()
         os.unlink(path)
 
+VERIFY_PROP_RE = re.compile('^Verifying property ([0-9]+) at line ')
+
 def verify(modelfilename, queryfilename, verifyta='verifyta',
             searchorder='bfs', statespacereduction='1', approximation='', getoutput=False,
-            remotehost=None, remotedir='/tmp/'):
+            remotehost=None, remotedir='/tmp/', ssh_control_path=None):
+    """Run verifyta on a model and a query file, returning a result per query.
+
+    With remotehost, both files are copied to remotedir there, and verifyta is
+    run over ssh. Give ssh_control_path (e.g. '~/.ssh/pyuppaal-%r@%h:%p') to have
+    the copy and the run, and later calls with the same path, share one ssh
+    connection instead of each doing a full handshake. The connection is kept
+    open for 60 seconds after its last use."""
     searchorder = { 'bfs': '0', #Breadth first
                     'dfs': '1', #Depth first
                     'rdfs': '2', #Random depth first
@@ -511,64 +608,76 @@ def verify(modelfilename, queryfilename, verifyta='verifyta',
                     'tfs': '6', #Target first
                     }[searchorder]
 
-    cmdline = ''
+    argv = []
     #If we're using a remote host, copy stuff first
     if remotehost:
-        scpstuff = 'scp -q ' + modelfilename + ' ' + queryfilename + ' ' + remotehost + ':' + remotedir
-        subprocess.check_call(scpstuff, shell=True)
+        sshopts = []
+        if ssh_control_path:
+            sshopts = ['-o', 'ControlMaster=auto', '-o', 'ControlPersist=60',
+                '-o', 'ControlPath=' + ssh_control_path]
+        subprocess.check_call(['scp', '-q'] + sshopts +
+            [modelfilename, queryfilename, remotehost + ':' + remotedir])
 
         modelfilename = os.path.join(remotedir, os.path.basename(modelfilename))
         queryfilename = os.path.join(remotedir, os.path.basename(queryfilename))
 
-        cmdline = 'ssh ' + remotehost + ' '
+        argv = ['ssh'] + sshopts + [remotehost]
     if approximation == 'over':
-        approximation = ' -A '
-
-    cmdline += verifyta + ' -o' + searchorder + ' -S' + statespacereduction + \
-        approximation + \
-        ' -q ' + modelfilename + ' ' + queryfilename
-
-    #print 'Executing', cmdline
-    proc = subprocess.Popen(
-        cmdline, 
-        stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-    #TODO - report progress
-    (stdoutdata, stderrdata) = proc.communicate()
-
-    lines = stdoutdata.split('\n')
-    errlines = stderrdata.split('\n')
-
-    #Look for tell-tale signs that something went wrong
-    for line in errlines:
-        if "Internet connection is required for activation." in line:
-            raise Exception("UPPAAL verifyta error: " + line)
-
-    regex = re.compile('^Verifying property ([0-9]+) at line ')
-    res = []
-    lastprop = None
-    sub = None
-    for line in lines:
-        match = regex.match(line)
-        if lastprop:
-            if line.endswith(' -- Property is satisfied.'):
-                res += [True]
-            elif line.endswith(' -- Property is NOT satisfied.'):
-                res += [False]
-            elif line.endswith(' -- Property MAY be satisfied.'):
-                res += ['maybe']
-            else:
-                pass #Ignore garbage
+        approximation = '-A'
+
+    verifyargv = [verifyta, '-o' + searchorder, '-S' + statespacereduction] + \
+        approximation.split() + ['-q', modelfilename, queryfilename]
+    if remotehost:
+        #ssh hands the remote shell one command line, so quote each argument
+        argv += [' '.join([shlex.quote(a) for a in verifyargv])]
+    else:
+        argv = verifyargv
+
+    #print 'Executing', argv
+    #stderr goes to a file, so it can't fill up its pipe while stdout is read
+    with tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace') as errfile:
+        #Decoded as UTF-8 whatever the locale; a stray byte can't abort the parse
+        with subprocess.Popen(
+                argv,
+                stdout=subprocess.PIPE, stderr=errfile,
+                encoding='utf-8', errors='replace') as proc:
+            #TODO - report progress
+            #The output is parsed line by line as verifyta writes it, rather than buffered
+            output = []
+            res = []
             lastprop = None
-        elif line.endswith('sup:'):
-            sub = 1
-        elif sub:
-            res[-1] = line
             sub = None
-        elif match:
-            lastprop = int(match.group(1))
+            for line in proc.stdout:
+                if getoutput:
+                    output += [line]
+                line = line.rstrip('\n')
+                match = VERIFY_PROP_RE.match(line)
+                if lastprop:
+                    if line.endswith(' -- Property is satisfied.'):
+                        res += [True]
+                    elif line.endswith(' -- Property is NOT satisfied.'):
+                        res += [False]
+                    elif line.endswith(' -- Property MAY be satisfied.'):
+                        res += ['maybe']
+                    else:
+                        pass #Ignore garbage
+                    lastprop = None
+                elif line.endswith('sup:'):
+                    sub = 1
+                elif sub:
+                    res[-1] = line
+                    sub = None
+                elif match:
+                    lastprop = int(match.group(1))
+
+        #Look for tell-tale signs that something went wrong
+        errfile.seek(0)
+        for line in errfile:
+            if "Internet connection is required for activation." in line:
+                raise Exception("UPPAAL verifyta error: " + line.rstrip('\n'))
 
     if getoutput:
-        return (res, stdoutdata)
+        return (res, "".join(output))
 
     return res
 
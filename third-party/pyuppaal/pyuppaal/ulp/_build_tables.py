@@ -27,8 +27,7 @@
 # Generate c_ast.py
 #
 
-#from pyuppaal.ulp 
-import systemdec_parser
+from pyuppaal.ulp import systemdec_parser
 
 # Generates the tables
 #
@@ -40,4 +39,4 @@ systemdec_parser.SystemDeclarationParser('',
 # Load to compile into .pyc
 #
 #import lextab
-import systemdec_parser_yacctab
+from pyuppaal.ulp import systemdec_parser_yacctab
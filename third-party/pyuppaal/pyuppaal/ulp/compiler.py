@@ -16,11 +16,11 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <http://www.gnu.org/licenses/>. """
 
-from parser import *
-from lexer import *
+from pyuppaal.ulp.parser import *
+from pyuppaal.ulp.lexer import *
   
 if len(sys.argv) == 1:
-    print "usage : ./compile.py inputfile"
+    print("usage : ./compile.py inputfile")
     raise SystemExit
 
 if len(sys.argv) >= 2:
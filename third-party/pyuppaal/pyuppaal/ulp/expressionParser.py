@@ -20,8 +20,9 @@
     made by: Eli Bendersky (eliben@gmail.com)
 """
 
-from lexer import *
-from node import *
+from .lexer import *
+from .node import *
+import collections
 import operator
 import logging
 logger = logging.getLogger('expressionParser')
@@ -29,17 +30,63 @@ logger = logging.getLogger('expressionParser')
 logger.setLevel(logging.INFO)
 
 def ternary(condition, if_true, if_false):
-    if eval(condition):
-        return if_true
-    else:
-        return if_false
+    return if_true if condition else if_false
+
+# An operator recognized by the infix evaluator: its node name, the
+# Python function it corresponds to, its numeric precedence, how many
+# arguments it takes (1, 2 or 3) and whether it is right associative.
+Op = collections.namedtuple('Op', 'name func prec arity right_assoc')
+
+def _apply(op, args):
+    return Node(op.name, args)
 
 class IllegalExpressionException(Exception):
     pass
 
+#Tokens of the expressions parse_expression has parsed, by source string
+_expression_tokens = {}
+_MAX_EXPRESSION_TOKENS = 4096
+
+def clear_expression_cache():
+    """Forget the tokens cached by parse_expression."""
+    _expression_tokens.clear()
+
+class _TokenRecorder:
+    """Lexer handed to the expression parser: either lexes with the module
+    lexer, keeping every token it returns in tokens, or replays such tokens."""
+    def __init__(self, tokens=None):
+        self.tokens = []
+        self._replay = None if tokens is None else iter(tokens)
+
+    def input(self, data):
+        if self._replay is None:
+            lexer.input(data)
+
+    def token(self):
+        if self._replay is not None:
+            return next(self._replay, None)
+        tok = lexer.token()
+        self.tokens.append(tok)
+        return tok
+
 def parse_expression(data):
     """Helper function. Parses the string "data" and returns an AST of the
-    expression."""
+    expression.
+
+    The same guards and updates are parsed over and over, so the tokens of
+    the expressions are cached. The AST is built anew on every call, so the
+    caller may modify it."""
+    tokens = _expression_tokens.get(data)
+    if tokens is not None:
+        return _parse_expression(data, _TokenRecorder(tokens))
+    recorder = _TokenRecorder()
+    res = _parse_expression(data, recorder)
+    if len(_expression_tokens) >= _MAX_EXPRESSION_TOKENS:
+        _expression_tokens.clear()
+    _expression_tokens[data] = tuple(recorder.tokens)
+    return res
+
+def _parse_expression(data, lex=lexer):
     class myToken:
         type = None
         def __init__(self, type):
@@ -115,7 +162,7 @@ def parse_expression(data):
         def error(self, msg):
             raise IllegalExpressionException('Illegal expression: ' + msg)
 
-    helperParser = DummyHelperParser(lexer)
+    helperParser = DummyHelperParser(lex)
     return helperParser.parse(data)
 
 class ExpressionParser:
@@ -123,6 +170,8 @@ class ExpressionParser:
     def __init__(self, lexer, parser):
         self.lexer = lexer
         self.parser = parser
+        #checked once per expression rather than once per operator
+        self._debug = logger.isEnabledFor(logging.DEBUG)
 
     def parse(self):
         if not self.parser.currentToken: #eof?
@@ -139,254 +188,195 @@ class ExpressionParser:
     ## and their precedences are controlled through the _ops 
     ## table.
     ##
-    ## Internally, uses two stacks. One for keeping the operations
-    ## that still await results, and another for keeping the 
-    ## results.
+    ## Internally, uses precedence climbing: each call parses the
+    ## operators binding at least as tightly as a given precedence,
+    ## and builds the nodes directly without any stacks.
     ##
     ##
 
     def _infix_eval(self):
         """ Run the infix evaluator and return the result.
         """
-        self.op_stack = []
-        self.res_stack = []
-        
-        self.op_stack.append(self._sentinel)
-        self._infix_eval_expr()
-        try:
-            return self.res_stack[-1]
-        except:
+        res = self._infix_eval_expr(0)
+        if res is None:
             self.parser.error("ExpressionParser parsing error")
+        return res
     
-    class Op(object):
-        """ Represents an operator recognized by the infix 
-            evaluator. Each operator has a numeric precedence, 
-            and flags specifying whether it's unary/binary and 
-            right/left associative.
-        """
-        def __init__(   self, name, op, prec, 
-                        arguments=2, right_assoc=False):
-            self.name = name
-            self.op = op
-            self.prec = prec
-
-            self.unary = False
-            self.binary = False
-            self.ternary = False
-
-            if arguments == 2:
-                self.binary = True
-            elif arguments == 1:
-                self.unary = True
-            else:
-                self.ternary = ternary
-
-            self.right_assoc = right_assoc
-            self.left_assoc = not self.right_assoc
-            
-        def apply(self, *args):
-            return Node(self.name, args)
-
-        def precedes(self, other):
-            """ The '>' operator from the Shunting Yard algorithm.
-                I don't call it '>' on purpose, as its semantics 
-                are unusual (i.e. this is not the familiar 
-                algebraic '>')
-            """
-            return self.prec >= other.prec
-#            if self.ternary and other.ternary:
-#                if self.prec > other.prec:
-#                    return True
-#                elif self.left_assoc and (self.prec == other.prec):
-#                    return True
-#            elif self.binary and other.binary:
-#                if self.prec > other.prec:
-#                    return True
-#                elif self.left_assoc and (self.prec == other.prec):
-#                    return True
-#            elif self.unary and other.binary:
-#                return self.prec >= other.prec
-            
-            return False
-
-        def __repr__(self):
-            return '<%s(%s)>' % (self.name, self.prec)
-    
-    # The operators recognized by the evaluator.
+    # The operators recognized by the evaluator. Each token type appears
+    # once; BITAND, XOR and BITOR used to also be listed with precedences
+    # 30, 29 and 28 above the comparisons, but those entries were always
+    # shadowed by the ones below, so the bitwise operators bind looser
+    # than equality, as in C.
     #
     _ops = {
-        'uMINUS':    Op('UnaryMinus', operator.neg, 90, arguments=1),
-        'uLNOT':     Op('UnaryNot', operator.not_, 90, arguments=1),
-        'uNOT':      Op('UnaryNot', operator.not_, 90, arguments=1),
-        'TIMES':     Op('Times', operator.mul, 50),
-        'DIVIDE':    Op('Divide', operator.div, 50),
-        'MODULO':    Op('Modulo', operator.mod, 50),
-        'PLUS':      Op('Plus', operator.add, 40),
-        'MINUS':     Op('Minus', operator.sub, 40),
-        'LSHIFT':    Op('LeftShift', operator.lshift, 35),
-        'RSHIFT':    Op('RightShift', operator.rshift, 35),
-        'BITAND':    Op('BitAnd', operator.and_, 30),
-        'XOR':       Op('Xor', operator.xor, 29),
-        'BITOR':     Op('BitOr', operator.or_, 28),
-
-        'GREATER':   Op('Greater', operator.gt, 20),
-        'GREATEREQ': Op('GreaterEqual', operator.ge, 20),
-        'LESS':      Op('Less', operator.lt, 20),
-        'LESSEQ':    Op('LessEqual', operator.le, 20),
+        'uMINUS':    Op('UnaryMinus', operator.neg, 90, 1, False),
+        'uLNOT':     Op('UnaryNot', operator.not_, 90, 1, False),
+        'uNOT':      Op('UnaryNot', operator.not_, 90, 1, False),
+        'TIMES':     Op('Times', operator.mul, 50, 2, False),
+        'DIVIDE':    Op('Divide', operator.floordiv, 50, 2, False),
+        'MODULO':    Op('Modulo', operator.mod, 50, 2, False),
+        'PLUS':      Op('Plus', operator.add, 40, 2, False),
+        'MINUS':     Op('Minus', operator.sub, 40, 2, False),
+        'LSHIFT':    Op('LeftShift', operator.lshift, 35, 2, False),
+        'RSHIFT':    Op('RightShift', operator.rshift, 35, 2, False),
+
+        'GREATER':   Op('Greater', operator.gt, 20, 2, False),
+        'GREATEREQ': Op('GreaterEqual', operator.ge, 20, 2, False),
+        'LESS':      Op('Less', operator.lt, 20, 2, False),
+        'LESSEQ':    Op('LessEqual', operator.le, 20, 2, False),
         
-        'EQUAL':     Op('Equal', operator.eq, 15),
-        'NOTEQUAL':  Op('NotEqual', operator.ne, 15),
-
-        'BITAND':    Op('BitAnd', operator.and_, 14),
-        'XOR':       Op('Xor', operator.xor, 13),
-        'BITOR':     Op('BitOr', operator.or_, 12),
-        'LAND':      Op('And', operator.and_, 11), # && notice the operator is incorrect
-        'AND':      Op('And', operator.and_, 11), # && notice the operator is incorrect
-        'OR':      Op('Or', operator.or_, 11), # && notice the operator is incorrect
-        'LOR':       Op('Or', operator.or_, 11),   # || notice the operator is incorrect 
-        'CONDITIONAL':   Op('Conditional', ternary, 10, arguments=3,right_assoc=True),
-
-        #'AND':       Op('And', operator.and_, 10), # and
-        #'OR':        Op('Or', operator.or_, 10),   # or
+        'EQUAL':     Op('Equal', operator.eq, 15, 2, False),
+        'NOTEQUAL':  Op('NotEqual', operator.ne, 15, 2, False),
+
+        'BITAND':    Op('BitAnd', operator.and_, 14, 2, False),
+        'XOR':       Op('Xor', operator.xor, 13, 2, False),
+        'BITOR':     Op('BitOr', operator.or_, 12, 2, False),
+        'LAND':      Op('And', operator.and_, 11, 2, False), # && notice the operator is incorrect
+        'AND':      Op('And', operator.and_, 11, 2, False), # && notice the operator is incorrect
+        'OR':      Op('Or', operator.or_, 11, 2, False), # && notice the operator is incorrect
+        'LOR':       Op('Or', operator.or_, 11, 2, False),   # || notice the operator is incorrect 
+        'CONDITIONAL':   Op('Conditional', ternary, 10, 3, True),
+
+        #'AND':       Op('And', operator.and_, 10, 2, False), # and
+        #'OR':        Op('Or', operator.or_, 10, 2, False),   # or
         #XXX, we treat the logical ops the same as their names, e.g.
         # "&&" ~ "and", "!" ~ "not", this is not the same as the uppaal
         #documentation prescribes.
     }          
     
+    # The binary and ternary operators, i.e. the ones that can follow an atom,
+    # so the parsing loop finds the operator with a single lookup per token
+    #
+    _infix_ops = {type: op for type, op in _ops.items() if op.arity > 1}
+
     # A set of operators that can be unary. If such an operator
     # is found, 'u' is prepended to its symbol for finding it in
     # the _ops table
     #
-    _unaries = set(['MINUS', 'LNOT', 'NOT'])
+    _unaries = {'MINUS', 'LNOT', 'NOT'}
     
-    # Dummy operator with the lowest possible precedence (the 
-    # Sentinel value in the Shunting Yard algorithm)
-    #
-    _sentinel = Op(None, None, 0)
-
-    def _infix_eval_expr(self):
+    def _infix_eval_expr(self, min_prec):
         """ Evaluates an 'expression' - atoms separated by binary or ternary
-            operators.
+            operators, consuming the operators of precedence min_prec or
+            higher. All of them are left associative.
         """
-        self._infix_eval_atom()
-        ternary = False
-
-        while ( self.parser.currentToken and
-                self.parser.currentToken.type in self._ops and 
-                (self._ops[self.parser.currentToken.type].binary or self._ops[self.parser.currentToken.type].ternary)):
-            if self._ops[self.parser.currentToken.type].ternary:
-                ternary = True
-            logger.debug("%s, %s" % (str(self.res_stack), str(self.op_stack)))
-            self._push_op(self._ops[self.parser.currentToken.type])
+        parser = self.parser
+        infix_ops = self._infix_ops
+        lhs = self._infix_eval_atom()
+
+        token = parser.currentToken
+        while token:
+            op = infix_ops.get(token.type)
+            if op is None or op.prec < min_prec:
+                break
+            if self._debug:
+                logger.debug('infix op %s, lhs = %s', op, lhs)
             self._get_next_token()
-            self._infix_eval_atom()
 
-            if ternary:
+            if op.arity == 3:
+                #cond ? atom : expression
+                if_true = self._infix_eval_atom()
                 self._get_next_token()
-                self._infix_eval_atom()
-                ternary = False
-        
-        while self.op_stack[-1] != self._sentinel:
-            self._pop_op()
+                args = (lhs, if_true, self._infix_eval_expr(op.prec + 1))
+            else:
+                args = (lhs, self._infix_eval_expr(op.prec + 1))
+            if None in args:
+                parser.error('Not enough arguments for operator %s' % op.name)
+            lhs = _apply(op, args)
+            token = parser.currentToken
+        return lhs
         
     def _infix_eval_atom(self):
         """ Evaluates an 'atom' - either an identifier/number, or
             an atom prefixed by a unary operation, or a full
-            expression inside parentheses.
+            expression inside parentheses. Returns None if there is
+            no atom at the current token.
         """
-        if self.parser.currentToken.type == 'TRUE':
-            self.res_stack.append(Node('True'))
-            self.parser.accept('TRUE')
-        elif self.parser.currentToken.type == 'FALSE':
-            self.res_stack.append(Node('False'))
-            self.parser.accept('FALSE')
-        elif self.parser.currentToken.type in ['IDENTIFIER', 'NUMBER']:
-            if self.parser.currentToken.type == 'IDENTIFIER':
-                ident = self.parser.parseIdentifierComplex()
-                self.res_stack.append(ident)
-                if self.parser.currentToken.type == 'PLUSPLUS': #x++
-                    identifier = self.res_stack.pop()
-                    self.res_stack.append(Node('PlusPlusPost',[identifier]))
-                    self.parser.accept('PLUSPLUS')
-                elif self.parser.currentToken.type == 'MINUSMINUS': #x--
-                    identifier = self.res_stack.pop()
-                    self.res_stack.append(Node('MinusMinusPost', [identifier]))
-                    self.parser.accept('MINUSMINUS')
-                elif self.parser.currentToken.type == 'LPAREN':  #function call, f(..)
-                    self.parser.accept('LPAREN')
-                    #assert self.parser.currentToken.type == 'RPAREN'
-                    parameters = []
-                    while self.parser.currentToken.type != 'RPAREN':
-                        self.op_stack.append(self._sentinel)
-                        self._infix_eval_expr()
-                        if self.parser.currentToken.type == 'COMMA':
-                            self.parser.accept('COMMA')
-                        self.op_stack.pop()
-                        expr = self.res_stack.pop()
-                        parameters += [expr]
-                    self.parser.accept('RPAREN')
-                    
-                    identifier = self.res_stack.pop()
-                    self.res_stack.append(Node('FunctionCall', [identifier], parameters))
-                elif self.parser.currentToken.type == 'APOSTROPHE': #x' (used for clock rate "assignment")
-                    identifier = self.res_stack.pop()
-                    self.res_stack.append(Node('ClockRate', [], identifier.children[0]))
-                    self.parser.accept('APOSTROPHE')
-           # elif self.parser.currentToken.type == 'CONDITIONAL':
-           #     print "con", self.res_stack
-            else:
-                self.res_stack.append(self.parser.parseNumber())
-        elif self.parser.currentToken.type == 'LPAREN':
-            self._get_next_token()
-            self.op_stack.append(self._sentinel)
-            self._infix_eval_expr()
-            self.parser.accept('RPAREN')
-            self.op_stack.pop()
-        elif self.parser.currentToken.type in self._unaries:
-            self._push_op(self._ops['u' + self.parser.currentToken.type])
-            self._get_next_token()
-            self._infix_eval_atom()
-        elif self.parser.currentToken.type == 'PLUSPLUS':
-            self.parser.accept('PLUSPLUS')
-            self.res_stack.append(Node('PlusPlusPre', [self.parser.parseIdentifierComplex()]))
-        elif self.parser.currentToken.type == 'MINUSMINUS':
-            self.parser.accept('MINUSMINUS')
-            self.res_stack.append(Node('MinusMinusPre', [self.parser.parseIdentifierComplex()]))
-    
-    def _push_op(self, op):
-        """ Pushes an operation onto the op stack. 
-            But first computes and removes all higher-precedence 
-            operators from it.
-        """
-        logger.debug('push_op: op_stack = %s + %s' , str(self.op_stack), str(op))
-        while self.op_stack[-1].precedes(op):
-            self._pop_op()
-        self.op_stack.append(op)
-        logger.debug('     ... op_stack = %s', str(self.op_stack))
-    
-    def _pop_op(self):
-        """ Pops an operation from the op stack, computing its
-            result and storing it on the result stack.
+        handler = self._atom_handlers.get(self.parser.currentToken.type)
+        if handler is None:
+            return None
+        return handler(self)
+
+    def _atom_true(self):
+        self.parser.accept('TRUE')
+        return Node('True')
+
+    def _atom_false(self):
+        self.parser.accept('FALSE')
+        return Node('False')
+
+    def _atom_identifier(self):
+        parser = self.parser
+        identifier = parser.parseIdentifierComplex()
+        tt = parser.currentToken.type
+        if tt == 'PLUSPLUS': #x++
+            parser.accept('PLUSPLUS')
+            return Node('PlusPlusPost', [identifier])
+        elif tt == 'MINUSMINUS': #x--
+            parser.accept('MINUSMINUS')
+            return Node('MinusMinusPost', [identifier])
+        elif tt == 'LPAREN':  #function call, f(..)
+            parser.accept('LPAREN')
+            parameters = []
+            while parser.currentToken.type != 'RPAREN':
+                parameters.append(self._parse_argument(identifier))
+                if parser.currentToken.type == 'COMMA':
+                    parser.accept('COMMA')
+            parser.accept('RPAREN')
+            return Node('FunctionCall', [identifier], parameters)
+        elif tt == 'APOSTROPHE': #x' (used for clock rate "assignment")
+            parser.accept('APOSTROPHE')
+            return Node('ClockRate', [], identifier.children[0])
+        return identifier
+
+    def _parse_argument(self, function):
+        """ Parses one argument of a call to the function identified by
+            'function'.
         """
-        logger.debug('pop_op: op_stack = %s', str(self.op_stack))
-        logger.debug('    ... res_stack = %s', str(self.res_stack))
-        top_op = self.op_stack.pop()
-        
-        if top_op.unary:
-            self.res_stack.append(top_op.apply(self.res_stack.pop()))
-        elif top_op.ternary:
-            t2 = self.res_stack.pop()
-            t1 = self.res_stack.pop()
-            t0 = self.res_stack.pop()
-            self.res_stack.append(top_op.apply(t0, t1, t2))
-        else:
-            if len(self.res_stack) < 2:
-                self.parser.error('Not enough arguments for operator %s' % top_op.name)
-                
-            t1 = self.res_stack.pop()
-            t0 = self.res_stack.pop()
-            self.res_stack.append(top_op.apply(t0, t1))
-        logger.debug('    ... res_stack = %s', str(self.res_stack))
+        expr = self._infix_eval_expr(0)
+        if expr is None:
+            self.parser.error('Invalid argument to function %s' %
+                function.children[0])
+        return expr
+
+    def _atom_number(self):
+        return self.parser.parseNumber()
+
+    def _atom_paren(self):
+        self._get_next_token()
+        expr = self._infix_eval_expr(0)
+        self.parser.accept('RPAREN')
+        return expr
+
+    def _atom_unary(self):
+        op = self._ops['u' + self.parser.currentToken.type]
+        self._get_next_token()
+        operand = self._infix_eval_atom()
+        if operand is None:
+            self.parser.error('Not enough arguments for operator %s' % op.name)
+        return _apply(op, (operand,))
+
+    def _atom_preinc(self):
+        self.parser.accept('PLUSPLUS')
+        return Node('PlusPlusPre', [self.parser.parseIdentifierComplex()])
+
+    def _atom_predec(self):
+        self.parser.accept('MINUSMINUS')
+        return Node('MinusMinusPre', [self.parser.parseIdentifierComplex()])
+
+    # The token types that can start an atom, and the function parsing
+    # the atom starting with each of them
+    #
+    _atom_handlers = {
+        'TRUE':       _atom_true,
+        'FALSE':      _atom_false,
+        'IDENTIFIER': _atom_identifier,
+        'NUMBER':     _atom_number,
+        'LPAREN':     _atom_paren,
+        'PLUSPLUS':   _atom_preinc,
+        'MINUSMINUS': _atom_predec,
+        **dict.fromkeys(_unaries, _atom_unary),
+    }
 
     def _get_next_token(self):
         self.parser.currentToken = self.lexer.token()
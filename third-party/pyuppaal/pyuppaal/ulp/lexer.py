@@ -106,64 +106,72 @@ tokens = [
     'APOSTROPHE',
     ] +list(reserved.values())
  
-# These are regular expression rules for simple tokens.
-# Operators (The following sections is inspired by c_lexer.py)
-t_PLUS        = r'\+'
-t_MINUS       = r'-'
-t_TIMES       = r'\*'
-t_DIVIDE      = r'/'
-t_MODULO      = r'%'
-t_BITAND      = r'&'
-t_BITOR       = r'\|'
-t_XOR         = r'\^'
-t_LSHIFT      = r'<<'
-t_RSHIFT      = r'>>'
-t_LOR         = r'\|\|'
-t_LAND        = r'&&'
-t_LNOT        = r'!'
-t_LESS        = r'<'
-t_GREATER     = r'>'
-t_LESSEQ      = r'<='
-t_GREATEREQ   = r'>='
-t_EQUAL       = r'=='
-t_NOTEQUAL    = r'!='
-t_PLUSPLUS    = r'\+\+'
-t_MINUSMINUS  = r'--'
-t_CONDITIONAL = r'\?'
-
-# Assignments
-t_EQUALS      = r'='
-t_ASSIGN      = r':='
-t_TIMESEQUAL  = r'\*='
-t_DIVEQUAL    = r'/='
-t_MODEQUAL    = r'%='
-t_PLUSEQUAL   = r'\+='
-t_MINUSEQUAL  = r'-='
-t_LSHIFTEQUAL = r'<<='
-t_RSHIFTEQUAL = r'>>='
-t_ANDEQUAL    = r'&='
-t_OREQUAL     = r'\|='
-t_XOREQUAL    = r'^='
-
-# Delimeters
-t_SEMI        = r';'
-t_COMMA       = r','
-t_DOT         = r'\.'
-t_COLON       = r':'
-t_LPAREN      = r'\('
-t_RPAREN      = r'\)'
-t_LCURLYPAREN = r'\{'
-t_RCURLYPAREN = r'\}'
-t_LBRACKET    = r'\['
-t_RBRACKET    = r'\]'
+# Operators, assignments and delimiters, by their literal text.
+# (The operator names are inspired by c_lexer.py)
+_OP_TABLE = {
+    # Operators
+    '+': 'PLUS',
+    '-': 'MINUS',
+    '*': 'TIMES',
+    '/': 'DIVIDE',
+    '%': 'MODULO',
+    '&': 'BITAND',
+    '|': 'BITOR',
+    '^': 'XOR',
+    '<<': 'LSHIFT',
+    '>>': 'RSHIFT',
+    '||': 'LOR',
+    '&&': 'LAND',
+    '!': 'LNOT',
+    '<': 'LESS',
+    '>': 'GREATER',
+    '<=': 'LESSEQ',
+    '>=': 'GREATEREQ',
+    '==': 'EQUAL',
+    '!=': 'NOTEQUAL',
+    '++': 'PLUSPLUS',
+    '--': 'MINUSMINUS',
+    '?': 'CONDITIONAL',
+    # Assignments
+    '=': 'EQUALS',
+    ':=': 'ASSIGN',
+    '*=': 'TIMESEQUAL',
+    '/=': 'DIVEQUAL',
+    '%=': 'MODEQUAL',
+    '+=': 'PLUSEQUAL',
+    '-=': 'MINUSEQUAL',
+    '<<=': 'LSHIFTEQUAL',
+    '>>=': 'RSHIFTEQUAL',
+    '&=': 'ANDEQUAL',
+    '|=': 'OREQUAL',
+    '^=': 'XOREQUAL',
+    # Delimeters
+    ';': 'SEMI',
+    ',': 'COMMA',
+    '.': 'DOT',
+    ':': 'COLON',
+    '(': 'LPAREN',
+    ')': 'RPAREN',
+    '{': 'LCURLYPAREN',
+    '}': 'RCURLYPAREN',
+    '[': 'LBRACKET',
+    ']': 'RBRACKET',
+    # Miscellaneous
+    "'": 'APOSTROPHE',
+}
 
-#Miscellaneous
-t_APOSTROPHE  = r"'"
+# All of the above as one alternation, longest first so that e.g. '<<='
+# wins over '<<' and '<'.
+_OP_REGEX = '|'.join(re.escape(op) for op in
+    sorted(_OP_TABLE, key=lambda op: (-len(op), op)))
 
 
 def t_IDENTIFIER(t):
     r'[a-zA-Z_][a-zA-Z_0-9]*'
     t.type = reserved.get(t.value,'IDENTIFIER')    # Check for reserved words
+    if t.type == 'IDENTIFIER':
+        # Names are used as dict keys all over (typedefs, constants, variables)
+        t.value = sys.intern(t.value)
     return t
 
 # Read in an int.
@@ -178,9 +186,16 @@ def t_COMMENT(t):
     t.lineno += t.value.count('\n')
 
 def t_MCOMMENT(t):
-    r'/\*(.|\n)*?\*/'
+    r'/\*[\s\S]*?\*/'
     t.lineno += t.value.count('\n')
 
+# Match any operator or delimiter in one rule and look up its token type.
+# Defined after the comment rules so '//' and '/*' still start comments.
+@lex.TOKEN(_OP_REGEX)
+def t_OP(t):
+    t.type = _OP_TABLE[t.value]
+    return t
+
 # Track line numbers.
 def t_NEWLINE(t):
     r'\n+'
@@ -193,7 +208,8 @@ t_ignore = ' \t'
 def t_error(t):
     raise SyntaxError("syntax error on line %d near '%s'" %
         (t.lineno, t.value))
-# Build the lexer.
-lexer = lex.lex()
+# Build the lexer. PLY's optimized mode is not used: it would load a
+# previously written lextab without checking it against the rules above.
+lexer = lex.lex(reflags=re.VERBOSE | re.UNICODE)
 
 # vim:ts=4:sw=4:expandtab
@@ -16,11 +16,23 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <http://www.gnu.org/licenses/>. """
 
-from util import *
+from .util import *
+
+#Default for Node's leaf; None is a real leaf value, e.g. for an Identifier
+#without an index list
+_NO_LEAF = object()
 
 #AST
 class Node(object):
-    def __init__(self, type, children=[], leaf=[], **kwargs):
+    # The attributes every node has, the shortcuts the parsers pass as
+    # keyword arguments and the ones set on nodes after parsing. There is
+    # no __dict__, so a misspelled attribute or keyword argument is an error.
+    __slots__ = ('type', 'children', 'leaf', 'level',
+        'expr', 'ident', 'identifier', 'identifierTypeDict', 'initval',
+        'instantiation', 'parameters', 'returntype', 'vartype', 'basic_type',
+        'priority')
+
+    def __init__(self, type, children=None, leaf=_NO_LEAF, **kwargs):
         """
         Old style:
         Node("TemplateInstantiation", parameters, templateident)
@@ -35,20 +47,24 @@ class Node(object):
         elif type == "Identifier":
             assert isinstance(self, Identifier), "Use subclass Identifier"
         self.type = type
-        self.children = children
-        self.leaf = leaf
+        self.children = [] if children is None else children
+        self.leaf = [] if leaf is _NO_LEAF else leaf
 
-        for key, value in kwargs.iteritems():
-            setattr(self, key, value)
+        for key, value in kwargs.items():
+            try:
+                setattr(self, key, value)
+            except AttributeError:
+                raise TypeError("%s() got an unexpected keyword argument '%s'" %
+                    (self.__class__.__name__, key))
 
     def print_node(self):
-        print "visit", "  "*self.level, self.type, 
+        print("visit", "  "*self.level, self.type, end=' ')
         if self.leaf != []:
-            print self.leaf
+            print(self.leaf)
             if self.leaf.__class__.__name__ == 'Node':
-                print "visit-node", "  "*(self.level+1), self.leaf.type
+                print("visit-node", "  "*(self.level+1), self.leaf.type)
         else:
-            print 
+            print()
         return True
 
     def __repr__(self):
@@ -67,7 +83,7 @@ class Node(object):
                     v.visit(visitor, self.level+1);
                 except:
                     if visitor == Node.print_node:
-                        print "visit", "  "*(self.level+1), v
+                        print("visit", "  "*(self.level+1), v)
                     pass 
 
 class Identifier(Node):
@@ -77,10 +93,13 @@ class Identifier(Node):
     @strname is the name of the identifier (as string)
     @indexList is an array access
     @dotchild is an dot access of a child element (struct)
+    @full_name is the dotted name, e.g. "a.b", once it has been computed
 
     e.g. "a[5].b" =>
     Identifier("a", indexList=[5], dotchild=Identifier("b"))
     """
+    __slots__ = ('strname', 'indexList', 'dotchild', 'full_name')
+
     def __init__(self, strname, indexList=None, dotchild=None):
         children = [strname]
         if dotchild:
@@ -89,6 +108,7 @@ class Identifier(Node):
         self.strname = strname
         self.indexList = indexList
         self.dotchild = dotchild
+        self.full_name = None
 
 class VarDecl(Node):
     """
@@ -99,6 +119,7 @@ class VarDecl(Node):
     @basic_type is the underlying type, e.g. "TypeInt"
     @typenode is a reference to the AST node representing the type
     """
+    __slots__ = ('array_dimensions', 'range_min', 'range_max')
 
     def __init__(self, identifier, typeNode, array_dimensions=None, initval=None):
         super(VarDecl, self).__init__("VarDecl", children=[identifier], leaf=initval)
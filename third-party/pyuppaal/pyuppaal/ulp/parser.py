@@ -20,10 +20,10 @@
 from collections import OrderedDict
 import copy
 
-from lexer import *
-import expressionParser
-from node import *
-from util import *
+from .lexer import *
+from . import expressionParser
+from .node import *
+from .util import *
 
 
 class UnexpectedTokenException(Exception):
@@ -58,7 +58,7 @@ class Parser(object):
             while self.currentToken:
                 statements.append(self.parseCurrentStatement())
             return statements
-        except UnexpectedTokenException, e:
+        except UnexpectedTokenException:
             self.error('at token "%s" on line %d: Did not expect any token, but found token of type %s' % (self.currentToken.value, self.currentToken.lineno, self.currentToken.type))
 
     def parseCurrentStatement(self):
@@ -741,7 +741,7 @@ class Parser(object):
         else:
             endIndex = token.lexpos + 100
 
-        print "\n\nError parsing:\n", self.lexer.lexdata[startIndex:endIndex], "\n\n\n"
+        print("\n\nError parsing:\n", self.lexer.lexdata[startIndex:endIndex], "\n\n\n")
         raise Exception('Error: Parser error '+ msg)
 
 
@@ -15,10 +15,9 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <http://www.gnu.org/licenses/>. """
 
-#from lexer import *
-import lexer
-from node import Node
-from parser import *
+from . import lexer
+from .node import Node
+from .parser import *
 
 import ply.yacc as yacc
 import os
@@ -17,10 +17,10 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <http://www.gnu.org/licenses/>. """
 
-from lexer import *
-import expressionParser
-import parser
-from node import Node
+from .lexer import *
+from . import expressionParser
+from . import parser
+from .node import Node
 
 
 class updateStatementParser(parser.Parser):
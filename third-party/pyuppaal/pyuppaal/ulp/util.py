@@ -45,6 +45,9 @@ def get_last_name_from_complex_identifier(n):
     e.g., myidentifier.someotheridentifier.nestedidentifier.
     """
 def get_full_name_from_complex_identifier(identifierNode):
+    #The name is looked up many times per identifier, so it is memoized on the node
+    if identifierNode.full_name is not None:
+        return identifierNode.full_name
     id_str = identifierNode.children[0]
 
     #parse out entire name (follow dots)
@@ -53,6 +56,7 @@ def get_full_name_from_complex_identifier(identifierNode):
         curnode = curnode.children[1]
         id_str += '.' + curnode.children[0]
 
+    identifierNode.full_name = id_str
     return id_str
 
 """ Takes an identifier and return the list of names:
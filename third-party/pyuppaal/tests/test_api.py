@@ -6,7 +6,6 @@ sys.path = [projdir] + sys.path
 from pyuppaal import *
 import unittest
 import os
-from nose.tools import nottest
 
 class TestAPI(unittest.TestCase):
     def test_transition_create(self):
@@ -35,6 +34,9 @@ class TestAPI(unittest.TestCase):
         l = Label("guard")
         l.append('a==b')
         self.assertEqual(l.get_value(), "a==b")
+        for i in range(3):
+            l.append_and('x%d' % i, auto_newline=False)
+        self.assertEqual(l.value, "a==b && x0 && x1 && x2")
 
     def test_create_multi_nta(self):
         nta1 = NTA()
@@ -58,6 +60,15 @@ class TestAPI(unittest.TestCase):
         self.assertEqual(t1.source, t2.source)
         self.assertEqual(t1.target, t2.target)
 
+    def test_sharpen(self):
+        l1 = Location(xpos=0, ypos=0)
+        l2 = Location(xpos=40, ypos=40)
+        t = Transition(l1, l2)
+        #two nails on the straight line to the corner, one right on top of it
+        t.nails = [Nail(10, 0), Nail(20, 0), Nail(40, 0), Nail(40, 0)]
+        self.assertEqual(t.sharpen(110.0, 1.0), 3)
+        self.assertEqual([(n.xpos, n.ypos) for n in t.nails], [(40, 0)])
+
     def test_get_location_by_name(self):
         nta1 = NTA()
         temp1 = Template('temp1')
@@ -70,6 +81,30 @@ class TestAPI(unittest.TestCase):
         self.assertEqual(temp1.get_location_by_name('a'), l1)
         self.assertEqual(temp1.get_location_by_name('b'), l2)
 
+        #lookups follow changes made to the locations after a lookup
+        l2.name.value = 'c'
+        self.assertEqual(temp1.get_location_by_name('c'), l2)
+        l3 = Location(name='d')
+        temp1.locations += [l3]
+        self.assertEqual(temp1.get_location_by_name('d'), l3)
+        temp1.locations += [Location(name='a')]
+        self.assertRaises(AssertionError, temp1.get_location_by_name, 'a')
+
+        #replacing a location in place, or renaming one to a taken name
+        temp1.locations[:] = [l1, l2, l3]
+        self.assertEqual(temp1.get_location_by_name('a'), l1)
+        l4 = Location(name='a')
+        temp1.locations[0] = l4
+        self.assertEqual(temp1.get_location_by_name('a'), l4)
+        temp1.locations[0] = l1
+        self.assertEqual(temp1.get_location_by_name('a'), l1)
+        l3.name.value = 'a'
+        self.assertRaises(AssertionError, temp1.get_location_by_name, 'a')
+        l3.name.value = 'd'
+        self.assertEqual(temp1.get_location_by_name('a'), l1)
+        l3.name.append('e', auto_newline=False, sep='')
+        self.assertEqual(temp1.get_location_by_name('de'), l3)
+
 
     def test_verify(self):
         ntafilename = os.path.join(os.path.dirname(__file__), 'small_verify.xml')
@@ -80,14 +115,13 @@ class TestAPI(unittest.TestCase):
         try:
             res = verify(ntafilename, qfname)
             self.assertEqual(res, [True], "There was a problem calling 'verifyta', maybe its not on your PATH, or the output format has changed?")
-        except Exception, e:
+        except Exception:
             #verifyta can fail in many ways: no internet connection for license, etc.
             pass
 
         qf.deleteTempFile(qfh)
 
     
-    @nottest
     def DISABLED_test_verify_remote(self):
         ntafilename = os.path.join(os.path.dirname(__file__), 'small_verify.xml')
 
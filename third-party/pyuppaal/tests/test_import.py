@@ -6,6 +6,7 @@ sys.path = [projdir] + sys.path
 import pyuppaal
 import unittest
 import os
+import io
 
 class TestMinimalImport(unittest.TestCase):
     def test_import_minimal(self):
@@ -44,6 +45,32 @@ system Process;""")
             #print "Layouting ", template.name
             template.layout()
 
+    def test_import_many_templates_streamed(self):
+        file = open(os.path.join(os.path.dirname(__file__), 'petur_boegholm_testcase.xml'))
+        nta = pyuppaal.NTA.from_xml(file)
+        self.assertEqual([t.name for t in nta.templates[:3]],
+            ['Scheduler', 'PeriodicThread', 'SporadicThread'])
+        self.assertEqual(nta.templates[-1].name, 'Template_0017')
+        self.assertTrue(nta.declaration.startswith('//\nconst int periodicThreads = 2;'))
+        self.assertTrue(nta.system.endswith('Scheduler;'))
+
+    def test_import_from_string(self):
+        xml = open(os.path.join(os.path.dirname(__file__), 'minimal.xml')).read()
+        nta = pyuppaal.NTA.from_xml(io.StringIO(xml))
+        self.assertEqual(len(nta.templates), 1)
+        self.assertEqual(nta.templates[0].locations[0].xpos, 16)
+
+    def test_export_escaped_text(self):
+        file = open(os.path.join(os.path.dirname(__file__), 'small.xml'))
+        nta = pyuppaal.NTA.from_xml(file)
+        nta.declaration = 'const char q = "<&>";'
+        nta.templates[0].transitions[0].guard.value = 'x < 2 && y > 1'
+        xml = nta.to_xml()
+        self.assertTrue('<declaration>const char q = "&lt;&amp;&gt;";</declaration>' in xml)
+        nta = pyuppaal.NTA.from_xml(io.StringIO(xml))
+        self.assertEqual(nta.declaration, 'const char q = "<&>";')
+        self.assertEqual(nta.templates[0].transitions[0].guard.value, 'x < 2 && y > 1')
+
     def test_import_petur_boegholm_minimal(self):
         file = open(os.path.join(os.path.dirname(__file__), 'petur_boegholm_testcase_minimal.xml'))
         nta = pyuppaal.NTA.from_xml(file)
@@ -54,6 +81,21 @@ system Process;""")
         self.assertEqual(len(schedulerTemplate.transitions), 6)
         schedulerTemplate.layout(auto_nails=True)
 
+    def test_layout_unchanged_template_once(self):
+        file = open(os.path.join(os.path.dirname(__file__), 'petur_boegholm_testcase_minimal.xml'))
+        schedulerTemplate = pyuppaal.NTA.from_xml(file).templates[0]
+        schedulerTemplate.layout(auto_nails=True)
+        nails = [t.nails for t in schedulerTemplate.transitions]
+        schedulerTemplate.layout(auto_nails=True)
+        self.assertEqual([t.nails for t in schedulerTemplate.transitions], nails)
+        #a changed label, or different arguments, lays it out again
+        schedulerTemplate.transitions[0].guard.value = 'x > 1'
+        schedulerTemplate.layout(auto_nails=True)
+        self.assertNotEqual(schedulerTemplate.transitions[0].nails, nails[0])
+        nails = [t.nails for t in schedulerTemplate.transitions]
+        schedulerTemplate.layout(auto_nails=True, nailAngleThreshold=100.0)
+        self.assertNotEqual(schedulerTemplate.transitions[0].nails, nails[0])
+
     def test_import_template_parameter_minimal(self):
         file = open(os.path.join(os.path.dirname(__file__), 'parameter_minimal.xml'))
         nta = pyuppaal.NTA.from_xml(file)
@@ -142,6 +184,9 @@ system Process;""")
 
         lines = fh.read().split('\n')
         self.assertEqual(lines[-1], '//NO_QUERY')
+        self.assertEqual(open(path).read(), qf.to_string())
+        qf.deleteTempFile(fh)
+        self.assertFalse(os.path.exists(path))
 
     def test_tga(self):
         file = open(os.path.join(os.path.dirname(__file__), 'tga.xml'))
@@ -11,7 +11,26 @@ class TestBasicParsing(unittest.TestCase):
         lex = lexer.lexer
         declaration = '// comment'
         pars = parser.Parser(declaration, lex)
-    
+
+    def test_lex_operators(self):
+        lex = lexer.lexer.clone()
+        lex.input("a ^= b <<= c <= d << e || f' /* x */ != g;")
+        self.assertEqual([t.type for t in iter(lex.token, None)],
+            ['IDENTIFIER', 'XOREQUAL', 'IDENTIFIER', 'LSHIFTEQUAL',
+             'IDENTIFIER', 'LESSEQ', 'IDENTIFIER', 'LSHIFT', 'IDENTIFIER',
+             'LOR', 'IDENTIFIER', 'APOSTROPHE', 'NOTEQUAL', 'IDENTIFIER',
+             'SEMI'])
+
+        lex.input("a /* b\n * c */ d /**/ e /* f */ */")
+        self.assertEqual([t.value for t in iter(lex.token, None)],
+            ['a', 'd', 'e', '*', '/'])
+
+    def test_identifier_names_interned(self):
+        res = expressionParser.parse_expression("some_name + some_name")
+        name = res.children[0].strname
+        self.assertTrue(name is res.children[1].strname)
+        self.assertTrue(name is sys.intern(''.join(['some_', 'name'])))
+
     def test_error_upc_raise_exception(self):
         lex = lexer.lexer
         declaration = 'foo' #illegal statement
@@ -40,8 +59,8 @@ class TestBasicParsing(unittest.TestCase):
         
         #print map(tuple, declvisitor.variables)
         #before declvisitor rewrite not all clocks were stored in variables
-        #self.assertEqual(map(tuple, declvisitor.variables), [('a', 'TypeInt', [], None), ('b', 'TypeBool', [], None), ('b1', 'TypeBool', [], None), ('b2', 'TypeBool', [], None)])
-        self.assertEqual(map(tuple, declvisitor.variables), [('a', 'TypeInt', [], None), ('b', 'TypeBool', [], None), ('b1', 'TypeBool', [], None), ('b2', 'TypeBool', [], None), ('c', 'TypeClock', [], None)])
+        #self.assertEqual(list(map(tuple, declvisitor.variables)), [('a', 'TypeInt', [], None), ('b', 'TypeBool', [], None), ('b1', 'TypeBool', [], None), ('b2', 'TypeBool', [], None)])
+        self.assertEqual(list(map(tuple, declvisitor.variables)), [('a', 'TypeInt', [], None), ('b', 'TypeBool', [], None), ('b1', 'TypeBool', [], None), ('b2', 'TypeBool', [], None), ('c', 'TypeClock', [], None)])
 
         self.assertEqual(len(declvisitor.clocks), 1)
         self.assertEqual(declvisitor.clocks[0][0], 'c')
@@ -80,7 +99,7 @@ class TestBasicParsing(unittest.TestCase):
         self.assertEqual(declvisitor.channels, [('take', []), ('release', [])])
 
         inorder = ["fastest", "fast", "slow", "slowest", "N"]
-        self.assertEqual(declvisitor.constants.keys(), inorder)
+        self.assertEqual(list(declvisitor.constants.keys()), inorder)
 
 
     def test_parse_empty_query(self):
@@ -198,7 +217,7 @@ class TestBasicParsing(unittest.TestCase):
         self.assertEqual(len(declvisitor.variables), 4)
         
         #pars.AST.visit()
-        print "variables", map(tuple, declvisitor.variables)
+        print("variables", list(map(tuple, declvisitor.variables)))
         varnames = [x for (x, _, _, _) in declvisitor.variables]
         self.assertTrue('m' in varnames)
         
@@ -208,7 +227,7 @@ class TestBasicParsing(unittest.TestCase):
         self.assertTrue('n2' in varnames)
         
         #check ranges inherited from typedef
-        print "type", declvisitor.get_vardecl('n').vartype
+        print("type", declvisitor.get_vardecl('n').vartype)
         self.assertEqual(declvisitor.get_vardecl('n').basic_type, "TypeInt")
         self.assertEqual(declvisitor.get_vardecl('n').range_min.type, "Number")
         self.assertEqual(declvisitor.get_vardecl('n').range_min.leaf, 1)
@@ -233,7 +252,7 @@ class TestBasicParsing(unittest.TestCase):
         with self.assertRaises(Exception) as context:
             parser.Parser(declaration, lex)
         
-        self.assertEqual(context.exception.message, 'Currently, we do not allow adding new clock types, e.g., typedef clock rtclock')
+        self.assertEqual(str(context.exception), 'Currently, we do not allow adding new clock types, e.g., typedef clock rtclock')
 
     def test_parse_brackets(self):
         test_file = open(os.path.join(os.path.dirname(__file__), 'test_brackets.txt'), "r")
@@ -311,8 +330,42 @@ class TestBasicParsing(unittest.TestCase):
         self.assertEqual(pars.AST.children[1].children[15].children[0].children[0].children[1].type, "Identifier")
         self.assertEqual(pars.AST.children[1].children[15].children[0].children[0].children[1].children[0], "a")
 
-        #TODO add more operators pars.AST.visit() 
-        self.assertEqual(len(pars.AST.children), 2)   
+        #TODO add more operators pars.AST.visit()
+        self.assertEqual(len(pars.AST.children), 2)
+
+    def test_nodes_use_slots(self):
+        test_file = open(os.path.join(os.path.dirname(__file__), 'test_operators.txt'), "r")
+        pars = parser.Parser(test_file.read(), lexer.lexer)
+        test_file.close()
+        nodes = []
+        def visitor(n):
+            nodes.append(n)
+            return True
+        pars.AST.visit(visitor)
+        self.assertTrue(len(nodes) > 50)
+        self.assertEqual([n for n in nodes if hasattr(n, '__dict__')], [])
+        #so misspelled attributes and keyword arguments are rejected
+        self.assertRaises(TypeError, node.Node, 'Function', [], None, paramters=[])
+        self.assertRaises(AttributeError, setattr, nodes[0], 'basictype', 'TypeInt')
+
+    def test_node_defaults_not_shared(self):
+        a = node.Node('True')
+        b = node.Node('False')
+        a.children.append('x')
+        a.leaf.append('y')
+        self.assertEqual(b.children, [])
+        self.assertEqual(b.leaf, [])
+        self.assertEqual(node.Node('Index', [], None).leaf, None)
+
+    def test_parses_share_no_nodes(self):
+        a = expressionParser.parse_expression("x + 1")
+        b = expressionParser.parse_expression("y == 1 && true != true")
+        a.children[1].leaf = 5
+        self.assertEqual(b.children[0].children[1].leaf, 1)
+        right = b.children[1]
+        self.assertFalse(right.children[0] is right.children[1])
+        self.assertFalse(expressionParser.parse_expression("true") is
+            expressionParser.parse_expression("true"))
 
     def test_parse_assignments(self):
         test_file = open(os.path.join(os.path.dirname(__file__), 'test_assignments.txt'), "r")
@@ -482,7 +535,7 @@ class TestBasicParsing(unittest.TestCase):
         res = parser.parse_expression("Viking1.safe and Viking2.safe") #TODO add struct support
         self.assertEqual(res.type, "And")
         self.assertEqual(res.children[0].type, "Identifier")
-        print res.children[0]
+        print(res.children[0])
         self.assertEqual(res.children[0].children[0], "Viking1")
         self.assertEqual(res.children[0].children[1].type, "Identifier")
         self.assertEqual(res.children[0].children[1].children[0], "safe")
@@ -521,6 +574,15 @@ class TestBasicParsing(unittest.TestCase):
         self.assertEqual(res.children[0].children[0], 'N')
         self.assertEqual(res.children[1].type, "Number")
         self.assertEqual(res.children[1].leaf, 1)
+        #parsing the same string again builds a new AST from the cached tokens
+        res.children[0].children[0] = 'M'
+        res2 = parser.parse_expression("N - 1")
+        self.assertFalse(res2 is res)
+        self.assertEqual(res2.type, "Minus")
+        self.assertEqual(res2.children[0].children[0], 'N')
+        self.assertEqual(res2.children[1].leaf, 1)
+        parser.clear_expression_cache()
+        self.assertEqual(parser.parse_expression("N - 1").children[0].children[0], 'N')
 
         res = parser.parse_expression("f() == 2")
         self.assertEqual(res.type, "Equal") 
@@ -754,6 +816,28 @@ class TestBasicParsing(unittest.TestCase):
         self.assertEqual(res.children[1].children[2].type, "Number")
         self.assertEqual(res.children[2].type, "Times")
 
+    def test_parse_expression_stacked_unary(self):
+        parser = expressionParser
+        res = parser.parse_expression("1 > 1 && !-a")
+        self.assertEqual(res.type, "And")
+        self.assertEqual(res.children[0].type, "Greater")
+        self.assertEqual(res.children[1].type, "UnaryNot")
+        self.assertEqual(res.children[1].children[0].type, "UnaryMinus")
+        self.assertEqual(res.children[1].children[0].children[0].type, "Identifier")
+
+        res = parser.parse_expression("a ? -1 : 2")
+        self.assertEqual(res.type, "Conditional")
+        self.assertEqual(res.children[1].type, "UnaryMinus")
+        self.assertEqual(res.children[2].type, "Number")
+
+    def test_parse_expression_bitwise_precedence(self):
+        parser = expressionParser
+        res = parser.parse_expression("a | b ^ c & d == 1")
+        self.assertEqual(res.type, "BitOr")
+        self.assertEqual(res.children[1].type, "Xor")
+        self.assertEqual(res.children[1].children[1].type, "BitAnd")
+        self.assertEqual(res.children[1].children[1].children[1].type, "Equal")
+
     def test_parse_func_with_params(self):
         parser = expressionParser
 
@@ -874,6 +958,9 @@ class TestBasicParsing(unittest.TestCase):
         self.assertEqual(len(dot.children), 1)
         self.assertEqual(dot.type, "Identifier")
         self.assertEqual(dot.children[0], "baz")
+        self.assertEqual(node.get_full_name_from_complex_identifier(ident), "a.foo.bar.baz")
+        self.assertEqual(ident.full_name, "a.foo.bar.baz")
+        self.assertEqual(node.get_last_name_from_complex_identifier(ident), "baz")
 
 
         res = parser.parse_expression("a.foo[2].bar[i].baz")
@@ -984,7 +1071,7 @@ class TestBasicParsing(unittest.TestCase):
 
         wideningIntRangeTypeNode = pars.typedefDict['WideningIntRange']
 
-        print "typedefdict:"
+        print("typedefdict:")
         wideningIntRangeTypeNode.visit()
 
         self.assertEqual(wideningIntRangeTypeNode.leaf.type, "Identifier")
@@ -1065,7 +1152,7 @@ class TestBasicParsing(unittest.TestCase):
 
         inorder = ["a", "b", "c", "d", "N"]
         #should return the constants in file order
-        self.assertEqual(declvisitor.constants.keys(), inorder)
+        self.assertEqual(list(declvisitor.constants.keys()), inorder)
 
     def test_parse_declare_intrange(self):
         test_file = open(os.path.join(os.path.dirname(__file__), 'test_declare_intrange.txt'), "r")